@@ -4,19 +4,23 @@ __copyright__ = '(C) 2025 by gudmandras'
 
 __revision__ = '$Format:%H$'
 
-import time, os, datetime, math
-from itertools import combinations
+import os, datetime, json, hashlib, sqlite3
+from itertools import chain
 from qgis.PyQt.QtGui import QIcon
-from qgis.PyQt.QtCore import QCoreApplication, QVariant
+from qgis.PyQt.QtCore import QCoreApplication, QVariant, QByteArray
 from qgis.core import (QgsWkbTypes,
-                       QgsPointXY,
                        QgsGeometry,
-                       QgsFeature,
                        QgsField,
                        QgsFields,
                        QgsVectorLayer,
                        QgsProcessing,
                        QgsFeatureSink,
+                       QgsFeatureRequest,
+                       QgsRectangle,
+                       QgsCoordinateReferenceSystem,
+                       QgsCoordinateTransform,
+                       QgsProviderRegistry,
+                       QgsApplication,
                        QgsProcessingAlgorithm,
                        QgsProcessingParameterFeatureSource,
                        QgsProcessingParameterFeatureSink,
@@ -26,14 +30,44 @@ from qgis.core import (QgsWkbTypes,
                        QgsProcessingParameterBoolean,
                        QgsProcessingParameterString,
                        QgsProcessingParameterField,
+                       QgsProcessingParameterCrs,
+                       QgsProcessingParameterEnum,
                        QgsProcessingParameterDefinition,
                        QgsProcessingParameterFile,
                        QgsProcessingException,
                        QgsProcessingMultiStepFeedback,
                        QgsProcessingParameterFileDestination)
+from .break_pointer_sink import BreakPointSink, ResultSink
+from .break_pointer_categories import CategoryIndex, DiskCategoryIndex
+from .break_pointer_core import (breakPointResults, largestPart, histogramBytes, decodePolygons,
+                                 polygonArea, polygonPerimeter)
+from .break_pointer_gpkg import GeoPackageReader
+from .break_pointer_profile import StageProfile
+from .break_pointer_wkb import vertexCount
+from .break_pointer_tiles import TileGrid
+from .break_pointer_crs import localCrsDefinition
+from .break_pointer_thinning import thinWkb
+from .break_pointer_columnar import ColumnarExport
+from .break_pointer_cache import AngleCache
+from .break_pointer_checkpoint import CheckpointJournal, runSignature
+from .break_pointer_spill import ResultSpill
+from .break_pointer_results import ResultStore, attributeRows, histogramSize
+
+# Rough memory use of one buffered item, used to size the streaming mode
+POINT_FEATURE_BYTES = 1024
+ATTRIBUTE_ROW_BYTES = 1024
+CATEGORY_ROW_BYTES = 128
+
+# Granularity of the break point layer
+OUTPUT_POINTS = 0
+OUTPUT_MULTIPOINTS = 1
+OUTPUT_NONE = 2
+OUTPUT_MODES = ['One point per break point', 'One MultiPoint per polygon', 'No break point layer']
 
 class BreakPointIndexAlgorithm(QgsProcessingAlgorithm):
 
+    HELP_FILE = 'shorthelp.txt'
+
     def initAlgorithm(self, config=None):
         self.addParameter(QgsProcessingParameterVectorLayer('InputLayer', 'Input layer',
                                                             types=[QgsProcessing.TypeVectorPolygon], defaultValue=None))
@@ -49,7 +83,117 @@ class BreakPointIndexAlgorithm(QgsProcessingAlgorithm):
         self.addParameter(QgsProcessingParameterString('PerimField', 'Perimeter density field name in the result file', defaultValue='dens_perim'))
         self.addParameter(QgsProcessingParameterString('AreaDField', 'Area density field name in the result file', defaultValue='dens_area'))
         self.addParameter(QgsProcessingParameterVectorDestination('OutputLayer', 'Break Point Index point layer',
-                                                    type=QgsProcessing.TypeVectorPoint, defaultValue=None))
+                                                    type=QgsProcessing.TypeVectorPoint, defaultValue=None,
+                                                    optional=True, createByDefault=True))
+
+        output_mode = QgsProcessingParameterEnum('OutputMode', 'Break point layer granularity', options=OUTPUT_MODES,
+                                                 defaultValue=OUTPUT_POINTS)
+        output_mode.setFlags(output_mode.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(output_mode)
+
+        angle_columns = QgsProcessingParameterBoolean('AngleColumns', 'Write the angle1 and angle2 bearing columns of the break points',
+                                                      defaultValue=True)
+        angle_columns.setFlags(angle_columns.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(angle_columns)
+
+        self.addParameter(QgsProcessingParameterFeatureSink('ResultLayer', 'Polygon results layer (input attributes and BPI fields, the input layer is left unchanged)',
+                                                            type=QgsProcessing.TypeVectorPolygon, optional=True,
+                                                            createByDefault=False))
+
+        self.addParameter(QgsProcessingParameterFeatureSink('ResultTable', 'Polygon results table (fid and BPI fields for joins, the input layer is left unchanged)',
+                                                            type=QgsProcessing.TypeVector, optional=True,
+                                                            createByDefault=False))
+
+        update_input = QgsProcessingParameterBoolean('UpdateInput', 'Write the BPI fields into the input layer when no polygon results layer or table is written',
+                                                     defaultValue=True)
+        update_input.setFlags(update_input.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(update_input)
+
+        batch_size = QgsProcessingParameterNumber('BatchSize', 'Break points written to the point layer in one batch',
+                                                  type=QgsProcessingParameterNumber.Integer,
+                                                  minValue=1, defaultValue=10000)
+        batch_size.setFlags(batch_size.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(batch_size)
+
+        workers = QgsProcessingParameterNumber('Workers', 'Number of workers (0 uses every CPU core)',
+                                               type=QgsProcessingParameterNumber.Integer,
+                                               minValue=0, defaultValue=1)
+        workers.setFlags(workers.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(workers)
+
+        angle_cache = QgsProcessingParameterBoolean('AngleCache', 'Cache the vertex angles next to the input layer for reruns',
+                                                    defaultValue=False)
+        angle_cache.setFlags(angle_cache.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(angle_cache)
+
+        cache_size = QgsProcessingParameterNumber('AngleCacheSize', 'Vertex angle cache size limit (MB)',
+                                                  type=QgsProcessingParameterNumber.Integer,
+                                                  minValue=1, defaultValue=1024)
+        cache_size.setFlags(cache_size.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(cache_size)
+
+        thresholds = QgsProcessingParameterString('Thresholds', 'Threshold sweep: extra lower-upper tolerance pairs separated by semicolons (e.g. 10-170;30-150)',
+                                                  optional=True)
+        thresholds.setFlags(thresholds.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(thresholds)
+
+        histogram_field = QgsProcessingParameterString('HistogramField', 'Vertex angle histogram (blob) field name in the result file',
+                                                       optional=True)
+        histogram_field.setFlags(histogram_field.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(histogram_field)
+
+        histogram_bins = QgsProcessingParameterNumber('HistogramBins', 'Number of vertex angle histogram bins over 0-180°',
+                                                      type=QgsProcessingParameterNumber.Integer,
+                                                      minValue=1, maxValue=3600, defaultValue=36)
+        histogram_bins.setFlags(histogram_bins.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(histogram_bins)
+
+        memory_limit = QgsProcessingParameterNumber('MemoryLimit', 'Memory ceiling of the streaming mode (MB, 0 keeps every result in memory)',
+                                                    type=QgsProcessingParameterNumber.Integer,
+                                                    minValue=0, defaultValue=0)
+        memory_limit.setFlags(memory_limit.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(memory_limit)
+
+        gpkg_fast_path = QgsProcessingParameterBoolean('GpkgFastPath', 'Read GeoPackage inputs directly with SQLite',
+                                                       defaultValue=True)
+        gpkg_fast_path.setFlags(gpkg_fast_path.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(gpkg_fast_path)
+
+        trace_memory = QgsProcessingParameterBoolean('TraceMemory', 'Trace the peak memory use (slower)', defaultValue=False)
+        trace_memory.setFlags(trace_memory.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(trace_memory)
+
+        tile_size = QgsProcessingParameterNumber('TileSize', 'Read the layer in square tiles of this size (map units, 0 reads it at once)',
+                                                 type=QgsProcessingParameterNumber.Double,
+                                                 minValue=0, defaultValue=0)
+        tile_size.setFlags(tile_size.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(tile_size)
+
+        checkpoint = QgsProcessingParameterBoolean('Checkpoint', 'Journal the progress next to the input layer to resume interrupted runs',
+                                                   defaultValue=False)
+        checkpoint.setFlags(checkpoint.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(checkpoint)
+
+        working_crs = QgsProcessingParameterCrs('WorkingCrs', 'Projected working CRS of the angles and measures (empty keeps the layer CRS)',
+                                                optional=True)
+        working_crs.setFlags(working_crs.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(working_crs)
+
+        auto_crs = QgsProcessingParameterBoolean('AutoCrs', 'Measure geographic layers in a local UTM or equal-area CRS',
+                                                 defaultValue=False)
+        auto_crs.setFlags(auto_crs.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(auto_crs)
+
+        thin_tolerance = QgsProcessingParameterNumber('ThinTolerance', 'Vertex thinning: drop the vertices closer than this to the last kept one (map units, 0 keeps all)',
+                                                      type=QgsProcessingParameterNumber.Double,
+                                                      minValue=0, defaultValue=0)
+        thin_tolerance.setFlags(thin_tolerance.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(thin_tolerance)
+
+        remove_collinear = QgsProcessingParameterBoolean('RemoveCollinear', 'Remove the exactly collinear and repeated vertices before the calculation',
+                                                         defaultValue=False)
+        remove_collinear.setFlags(remove_collinear.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(remove_collinear)
 
         id_field = QgsProcessingParameterString('IDField', 'Polygons ID field name in the result file', optional=True)
         id_field.setFlags(id_field.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
@@ -59,10 +203,27 @@ class BreakPointIndexAlgorithm(QgsProcessingAlgorithm):
         cat_field.setFlags(cat_field.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
         self.addParameter(cat_field)
 
+        topological = QgsProcessingParameterBoolean('TopologicalEdges', 'Measure shared edge length from the shared boundary segments (topological mode)',
+                                                    defaultValue=False)
+        topological.setFlags(topological.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(topological)
+
         text_path = QgsProcessingParameterFileDestination('Outxt', 'Output txt file', 'Text files (*.txt)', optional=True)
         text_path.setFlags(text_path.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
         self.addParameter(text_path)
 
+        matrix_path = QgsProcessingParameterFileDestination('PairMatrix', 'Output sparse category pair matrix', 'Text files (*.txt)', optional=True)
+        matrix_path.setFlags(matrix_path.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(matrix_path)
+
+        columnar_path = QgsProcessingParameterFileDestination('ColumnarOutput', 'Columnar break point and metric tables', 'GeoParquet files (*.parquet)', optional=True)
+        columnar_path.setFlags(columnar_path.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(columnar_path)
+
+        profile_path = QgsProcessingParameterFileDestination('ProfileOutput', 'Performance metrics', 'JSON files (*.json)', optional=True)
+        profile_path.setFlags(profile_path.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(profile_path)
+
     def name(self):
         return 'BreakPointIndex'
 
@@ -77,7 +238,7 @@ class BreakPointIndexAlgorithm(QgsProcessingAlgorithm):
 
     def shortHelpString(self):
         try:
-            with open(os.path.join(os.path.dirname(__file__), 'shorthelp.txt'), 'r',
+            with open(os.path.join(os.path.dirname(__file__), self.HELP_FILE), 'r',
                       encoding='utf-8') as file:
                 return file.read()
         except FileNotFoundError:
@@ -111,157 +272,544 @@ class BreakPointIndexAlgorithm(QgsProcessingAlgorithm):
         IDField = parameters['IDField']
         CatField = parameters['CatField']
         Outxt = parameters['Outxt']
-        if CatField and Outxt:
+        BatchSize = self.parameterAsInt(parameters, 'BatchSize', context)
+        Workers = self.parameterAsInt(parameters, 'Workers', context)
+        PairMatrix = self.parameterAsFileOutput(parameters, 'PairMatrix', context)
+        TopologicalEdges = self.parameterAsBoolean(parameters, 'TopologicalEdges', context)
+        ColumnarOutput = self.parameterAsFileOutput(parameters, 'ColumnarOutput', context)
+        AngleCacheOn = self.parameterAsBoolean(parameters, 'AngleCache', context)
+        AngleCacheSize = self.parameterAsInt(parameters, 'AngleCacheSize', context)
+        ThresholdPairs = self.parseThresholds(self.parameterAsString(parameters, 'Thresholds', context))
+        SweepFields = self.sweepFieldNames(BPIField, PerimField, AreaDField, ThresholdPairs)
+        HistogramField = self.parameterAsString(parameters, 'HistogramField', context)
+        HistogramBins = self.parameterAsInt(parameters, 'HistogramBins', context) if HistogramField else 0
+        MemoryLimit = self.parameterAsInt(parameters, 'MemoryLimit', context)
+        GpkgFastPath = self.parameterAsBoolean(parameters, 'GpkgFastPath', context)
+        TraceMemory = self.parameterAsBoolean(parameters, 'TraceMemory', context)
+        TileSize = self.parameterAsDouble(parameters, 'TileSize', context)
+        Checkpoint = self.parameterAsBoolean(parameters, 'Checkpoint', context)
+        WorkingCrs = self.parameterAsCrs(parameters, 'WorkingCrs', context)
+        AutoCrs = self.parameterAsBoolean(parameters, 'AutoCrs', context)
+        ThinTolerance = self.parameterAsDouble(parameters, 'ThinTolerance', context)
+        RemoveCollinear = self.parameterAsBoolean(parameters, 'RemoveCollinear', context)
+        OutputMode = self.parameterAsEnum(parameters, 'OutputMode', context)
+        AngleColumns = self.parameterAsBoolean(parameters, 'AngleColumns', context)
+        UpdateInput = self.parameterAsBoolean(parameters, 'UpdateInput', context)
+        ProfileOutput = self.parameterAsFileOutput(parameters, 'ProfileOutput', context)
+        WriteChunk = 10000
+        if MemoryLimit:
+            BatchSize, WriteChunk = self.streamingSizes(MemoryLimit, BatchSize)
+        if CatField and (Outxt or PairMatrix):
             feedback = QgsProcessingMultiStepFeedback(5, model_feedback)
         else:
             feedback = QgsProcessingMultiStepFeedback(4, model_feedback)
         inputLayer = self.parameterAsVectorLayer(parameters, 'InputLayer', context)
+        outputCrs, transform = self.workingTransform(inputLayer, WorkingCrs, AutoCrs, context)
         
         startTime = datetime.datetime.now()
         feedback.pushInfo(f"Start Time: {startTime}")
         feedback.pushInfo(f"Using angle thresholds: {LowerT}° to {UpperT}°")
-
-        self.createAttributeFields(inputLayer, [BPIField, PerimField, AreaDField], feedback)
-        if feedback.isCanceled():
-            return None
-        feedback.pushInfo(f"Fields updated for layer: {inputLayer.name()}")
-        feedback.setCurrentStep(1)
-
-        outputLayer, outputLayerPath = self.createOutputPointVector(parameters, inputLayer, IDField, context)
-        if feedback.isCanceled():
-            return None
-        feedback.pushInfo(f"Output point layer created: {outputLayerPath}")
-        feedback.setCurrentStep(2)
-
-        data, categoryPoints = self.calculateBPI(inputLayer, outputLayer, LowerT, UpperT, InnerRings, IDField, CatField, feedback)
-        if data is None or feedback.isCanceled():
-            return None
-        feedback.pushInfo(f"BPI calculation done!")
-        feedback.setCurrentStep(3)
-
-        self.setAttributes(inputLayer, data, [BPIField, PerimField, AreaDField])
-        if feedback.isCanceled():
-            return None
-        feedback.pushInfo(f"Attributes set for layer: {inputLayer.name()}")
-        feedback.setCurrentStep(4)
-
-        if CatField and Outxt:
-            self.saveTxt(categoryPoints, Outxt, feedback)
+        for lower, upper in ThresholdPairs:
+            feedback.pushInfo(f"Sweep angle thresholds: {lower:g}° to {upper:g}°")
+        if transform is not None:
+            feedback.pushInfo(f"Working CRS: {outputCrs.authid() or outputCrs.toProj()}, the break points and measures are in its units")
+        if MemoryLimit:
+            feedback.pushInfo(f"Streaming mode within {MemoryLimit} MB: {BatchSize} points and {WriteChunk} attribute rows per write")
+
+        profile = StageProfile(TraceMemory)
+        resultStore, categoryStore = self.resultStores(MemoryLimit, TopologicalEdges, ThresholdPairs, HistogramBins)
+        journal = None
+        finished = False
+        try:
+            resultFields = [BPIField, PerimField, AreaDField] + [name for names in SweepFields for name in names]
+            resultSinks, resultPaths = [], {}
+            for name in ('ResultLayer', 'ResultTable'):
+                resultSink, resultPath = self.createResultSink(parameters, name, context, inputLayer, resultFields,
+                                                               HistogramField, IDField, WriteChunk, len(ThresholdPairs),
+                                                               histogramSize(HistogramBins))
+                if resultSink is not None:
+                    resultSinks.append(resultSink)
+                    resultPaths[name] = resultPath
+                    feedback.pushInfo(f"Polygon results {'table' if name == 'ResultTable' else 'layer'} created: {resultPath}")
+            if resultSinks:
+                UpdateInput = False
+                feedback.pushInfo(f"The input layer is left unchanged: {inputLayer.name()}")
+                if 'ResultLayer' in resultPaths and GpkgFastPath:
+                    GpkgFastPath = False
+                    feedback.pushInfo("The polygon results layer copies the input attributes, reading through QGIS")
+            elif not UpdateInput:
+                feedback.pushInfo("The BPI fields are written neither to the input layer nor to a results layer")
+            if UpdateInput:
+                self.createAttributeFields(inputLayer, resultFields, feedback)
+                if HistogramField:
+                    self.createAttributeFields(inputLayer, [HistogramField], feedback, QVariant.ByteArray)
+                if feedback.isCanceled():
+                    return None
+                feedback.pushInfo(f"Fields updated for layer: {inputLayer.name()}")
+            if Checkpoint:
+                journal = self.checkpointJournal(inputLayer, LowerT, UpperT, InnerRings, ThresholdPairs, HistogramBins,
+                                                 TileSize, GpkgFastPath, outputCrs, ThinTolerance, RemoveCollinear)
+                if journal.completed:
+                    feedback.pushInfo(f"Resuming from {journal.path}: {journal.completed} features and {journal.pointCount} break points done")
+            profile.lap('fields')
+            feedback.setCurrentStep(1)
+
+            outputLayer, outputLayerPath = None, None
+            if OutputMode != OUTPUT_NONE:
+                outputLayer, outputLayerPath = self.createOutputPointVector(parameters, inputLayer, IDField, context, outputCrs,
+                                                                            OutputMode, AngleColumns, BPIField)
             if feedback.isCanceled():
                 return None
-            feedback.pushInfo(f"Results saved to txt: {Outxt}")
-            results['OutputTxt'] = Outxt
-            feedback.setCurrentStep(5)
-        endTime = datetime.datetime.now()
-        feedback.pushInfo(f"Calculation completed: {endTime} (Duration: {endTime - startTime})")
-
-        del outputLayer
-        results['OutputLayer'] = outputLayerPath
+            if outputLayer is not None:
+                feedback.pushInfo(f"Output point layer created: {outputLayerPath}")
+            else:
+                feedback.pushInfo("No break point layer is written")
+            profile.lap('outputLayer')
+            feedback.setCurrentStep(2)
+
+            columnar = self.createColumnarExport(ColumnarOutput, outputCrs) if ColumnarOutput else None
+            cache = AngleCache(self.angleCachePath(inputLayer), AngleCacheSize * 1024 * 1024) if AngleCacheOn else None
+            try:
+                data, categoryIndex = self.calculateBPI(inputLayer, outputLayer, LowerT, UpperT, InnerRings, IDField, CatField, feedback,
+                                                         batchSize=BatchSize, workers=Workers, topological=TopologicalEdges,
+                                                         columnar=columnar, cache=cache, thresholdPairs=ThresholdPairs,
+                                                         histogramBins=HistogramBins, data=resultStore,
+                                                         categoryIndex=categoryStore, fastPath=GpkgFastPath,
+                                                         profile=profile, tileSize=TileSize, journal=journal,
+                                                         transform=transform,
+                                                         thinTolerance=ThinTolerance, removeCollinear=RemoveCollinear,
+                                                         outputMode=OutputMode, angleColumns=AngleColumns,
+                                                         resultSinks=resultSinks)
+            finally:
+                if columnar:
+                    columnar.close()
+                if cache:
+                    evicted = cache.close()
+                    feedback.pushInfo(f"Vertex angle cache {cache.path}: {cache.hits} hits, {cache.misses} misses, {evicted} evicted")
+            if data is None or feedback.isCanceled():
+                return None
+            if columnar:
+                feedback.pushInfo(f"Columnar tables saved to: {columnar.pointsPath}, {columnar.metricsPath}")
+                results['OutputColumnar'] = columnar.pointsPath
+                results['OutputColumnarMetrics'] = columnar.metricsPath
+            profile.lap('calculateBPI')
+            feedback.pushInfo(f"BPI calculation done!")
+            feedback.setCurrentStep(3)
+
+            if UpdateInput:
+                self.setAttributes(inputLayer, data, [BPIField, PerimField, AreaDField], chunkSize=WriteChunk,
+                                   sweepAttributes=SweepFields, histogramAttribute=HistogramField)
+                if feedback.isCanceled():
+                    return None
+                profile.lap('setAttributes')
+                feedback.pushInfo(f"Attributes set for layer: {inputLayer.name()}")
+            results.update(resultPaths)
+            finished = True
+            feedback.setCurrentStep(4)
+
+            if CatField and Outxt:
+                self.saveTxt(categoryIndex, Outxt, feedback)
+                if feedback.isCanceled():
+                    return None
+                profile.lap('saveTxt')
+                feedback.pushInfo(f"Results saved to txt: {Outxt}")
+                results['OutputTxt'] = Outxt
+            if CatField and PairMatrix:
+                self.savePairMatrix(categoryIndex, PairMatrix)
+                profile.lap('pairMatrix')
+                feedback.pushInfo(f"Category pair matrix saved to: {PairMatrix}")
+                results['OutputPairMatrix'] = PairMatrix
+            if CatField and (Outxt or PairMatrix):
+                feedback.setCurrentStep(5)
+            endTime = datetime.datetime.now()
+            feedback.pushInfo(f"Calculation completed: {endTime} (Duration: {endTime - startTime})")
+            for line in profile.lines():
+                feedback.pushInfo(f"Performance - {line}")
+            if ProfileOutput:
+                profile.save(ProfileOutput)
+                results['OutputProfile'] = ProfileOutput
+
+            del outputLayer
+            if outputLayerPath:
+                results['OutputLayer'] = outputLayerPath
+        finally:
+            if journal:
+                journal.close(remove=finished)
+            resultStore.close()
+            categoryStore.close()
+            profile.close()
 
         return results
 
-    def createAttributeFields(self, inputLayer, newFields, feedback):
+    def streamingSizes(self, MemoryLimit, BatchSize):
+        """
+        Returns the point batch size and the attribute write chunk size
+        fitting into an eighth of the memory limit each.
+        """
+        budget = MemoryLimit * 1024 * 1024 // 8
+        return max(1, min(BatchSize, budget // POINT_FEATURE_BYTES)), max(1, budget // ATTRIBUTE_ROW_BYTES)
+
+    def resultStores(self, MemoryLimit, topological, thresholdPairs, histogramBins):
+        """
+        Returns the per feature result store and the category index, backed
+        by temporary files in the streaming mode.
+        """
+        if not MemoryLimit:
+            return ResultStore(len(thresholdPairs), histogramSize(histogramBins)), CategoryIndex(topological)
+        budget = MemoryLimit * 1024 * 1024
+        resultStore = ResultSpill(len(thresholdPairs), histogramSize(histogramBins), bufferBytes=budget // 8)
+        categoryStore = DiskCategoryIndex(topological, bufferRows=max(1, budget // 8 // CATEGORY_ROW_BYTES),
+                                          cacheBytes=budget // 4)
+        return resultStore, categoryStore
+
+    def parseThresholds(self, text):
+        """
+        Returns the (lower, upper) pairs of a '10-170;30-150' style string.
+        """
+        pairs = []
+        for item in (text or '').replace(' ', '').split(';'):
+            if not item:
+                continue
+            try:
+                lower, upper = (float(value) for value in item.split('-'))
+            except ValueError:
+                raise QgsProcessingException(f"Invalid threshold pair '{item}', use lower-upper like 20-160")
+            if not 0 <= lower <= upper <= 360:
+                raise QgsProcessingException(f"Invalid threshold pair '{item}', use 0 <= lower <= upper <= 360")
+            pairs.append((lower, upper))
+        return pairs
+
+    def sweepFieldNames(self, BPIField, PerimField, AreaDField, thresholdPairs):
+        return [[f"{name}_{lower:g}_{upper:g}".replace('.', '_') for name in (BPIField, PerimField, AreaDField)]
+                for lower, upper in thresholdPairs]
+
+    def createAttributeFields(self, inputLayer, newFields, feedback, fieldType=QVariant.Double):
         layerFields = [field.name() for field in inputLayer.fields()]
         for fieldName in newFields:
             if fieldName not in layerFields:
-                inputLayer.dataProvider().addAttributes([QgsField(fieldName, QVariant.Double, len=10, prec=5)])
+                if fieldType == QVariant.Double:
+                    field = QgsField(fieldName, fieldType, len=10, prec=5)
+                else:
+                    field = QgsField(fieldName, fieldType)
+                inputLayer.dataProvider().addAttributes([field])
                 feedback.pushInfo(f"Added field '{fieldName}' to {inputLayer.name()}")
         inputLayer.updateFields()
+        layerFields = inputLayer.fields().names()
+        for fieldName in newFields:
+            if fieldName not in layerFields:
+                raise QgsProcessingException(f"Field '{fieldName}' could not be created, the layer format may limit the field names or types")
 
-    def createOutputPointVector(self, parameters, inputLayer, id_field, context):
-        crs = inputLayer.crs()
+    def createResultSink(self, parameters, name, context, inputLayer, resultFields, histogramField, IDField,
+                         batchSize, pairCount, histogramBytes):
+        """
+        Returns the ResultSink of the ResultLayer or ResultTable output and
+        its id, or (None, None) when it is not requested. The polygon layer
+        copies the input fields, except the ones named like a result field,
+        the table holds the fid (and the ID) of the polygons.
+        """
+        tableOnly = name == 'ResultTable'
+        names = resultFields + ([histogramField] if histogramField else [])
         fields = QgsFields()
-        fields.append(QgsField('angle1', QVariant.Double))
-        fields.append(QgsField('angle2', QVariant.Double))
-        fields.append(QgsField('angle', QVariant.Double))
-        if id_field:
-            fields.append(QgsField(id_field, QVariant.String))
-        
+        if tableOnly:
+            attributeIndices = None
+            fields.append(QgsField('poly_fid', QVariant.LongLong))
+            if IDField:
+                fields.append(QgsField(IDField, QVariant.String))
+        else:
+            attributeIndices = [i for i, field in enumerate(inputLayer.fields()) if field.name() not in names]
+            for i in attributeIndices:
+                fields.append(inputLayer.fields().at(i))
+        fields.append(QgsField(resultFields[0], QVariant.Int))
+        for name in resultFields[1:]:
+            fields.append(QgsField(name, QVariant.Double))
+        if histogramField:
+            fields.append(QgsField(histogramField, QVariant.ByteArray))
+        sink, dest_id = self.parameterAsSink(parameters, name, context, fields,
+                                             QgsWkbTypes.NoGeometry if tableOnly else inputLayer.wkbType(),
+                                             inputLayer.crs())
+        if sink is None:
+            return None, None
+        return ResultSink(sink, batchSize, pairCount, histogramBytes if histogramField else 0, attributeIndices), dest_id
+
+    def createOutputPointVector(self, parameters, inputLayer, id_field, context, crs=None, outputMode=OUTPUT_POINTS,
+                                angleColumns=True, bpiField='bpi'):
+        crs = crs if crs is not None else inputLayer.crs()
         sink, dest_id = self.parameterAsSink(
             parameters,
             'OutputLayer',
             context,
-            fields,
-            QgsWkbTypes.Point,
+            self.outputPointFields(id_field, outputMode, angleColumns, bpiField),
+            QgsWkbTypes.MultiPoint if outputMode == OUTPUT_MULTIPOINTS else QgsWkbTypes.Point,
             crs
         )
 
         return sink, dest_id
 
+    def outputPointFields(self, id_field, outputMode=OUTPUT_POINTS, angleColumns=True, bpiField='bpi'):
+        fields = QgsFields()
+        if outputMode == OUTPUT_MULTIPOINTS:
+            # The polygon fid identifies the polygon when there is no ID field
+            fields.append(QgsField(id_field, QVariant.String) if id_field else QgsField('poly_fid', QVariant.LongLong))
+            fields.append(QgsField(bpiField, QVariant.Int))
+        else:
+            if angleColumns:
+                fields.append(QgsField('angle1', QVariant.Double))
+                fields.append(QgsField('angle2', QVariant.Double))
+            fields.append(QgsField('angle', QVariant.Double))
+            if id_field:
+                fields.append(QgsField(id_field, QVariant.String))
+        return fields
+
+
+    def featureRecords(self, inputLayer, IDField, CatField, fastPath=False, feedback=None, tileSize=0, transform=None,
+                       keepFeatures=False):
+        """
+        Yields (fid, wkb, poly_id, cat_value, area, perimeter, feature) for
+        every feature of the input layer, feature being the QgsFeature with
+        every attribute with keepFeatures set, otherwise None. With fastPath GeoPackage polygon layers
+        are read directly with SQLite. With a tileSize the features are
+        read tile by tile, each one in the tile of its bounding box corner.
+        With a transform the geometries are reprojected as a whole, before
+        they are measured.
+        """
+        grid = self.tileGrid(inputLayer, tileSize, feedback) if tileSize else None
+        reader = self.geoPackageReader(inputLayer, IDField, CatField, feedback) if fastPath else None
+        if reader is not None:
+            try:
+                if grid is not None and reader.spatialIndex() is None:
+                    feedback.pushInfo(f"{reader.table} has no spatial index, reading it without tiles")
+                    grid = None
+                yield from self.geoPackageRecords(reader, IDField, CatField, grid, transform)
+            finally:
+                reader.close()
+            return
+        request = QgsFeatureRequest()
+        if not keepFeatures:
+            request.setSubsetOfAttributes([field for field in (IDField, CatField) if field], inputLayer.fields())
+        if grid is None:
+            for feature in inputLayer.getFeatures(request):
+                yield self.featureRecord(feature, IDField, CatField, transform, keepFeatures)
+            return
+        for index, rect in grid.tiles():
+            request.setFilterRect(QgsRectangle(*rect))
+            for feature in inputLayer.getFeatures(request):
+                box = feature.geometry().boundingBox()
+                if grid.owns(index, (box.xMinimum(), box.yMinimum(), box.xMaximum(), box.yMaximum())):
+                    yield self.featureRecord(feature, IDField, CatField, transform, keepFeatures)
+        # Features with a NULL or empty geometry lie in no tile, they get the zero results of an untiled run
+        request.setFilterRect(QgsRectangle())
+        request.setFilterExpression('is_empty_or_null($geometry)')
+        for feature in inputLayer.getFeatures(request):
+            yield self.featureRecord(feature, IDField, CatField, transform, keepFeatures)
+
+    def featureRecord(self, feature, IDField, CatField, transform=None, keepFeature=False):
+        geom = feature.geometry()
+        if transform is not None:
+            geom.transform(transform)
+        area = geom.area()
+        perimeter = geom.length()
+        if QgsWkbTypes.isCurvedType(geom.wkbType()):
+            geom.convertToStraightSegment()
+        return (feature.id(),
+                bytes(geom.asWkb()),
+                feature[IDField] if IDField else None,
+                feature[CatField] if CatField else None,
+                area,
+                perimeter,
+                feature if keepFeature else None)
+
+    def tileGrid(self, inputLayer, tileSize, feedback):
+        extent = inputLayer.extent()
+        grid = TileGrid(extent.xMinimum(), extent.yMinimum(), extent.xMaximum(), extent.yMaximum(), tileSize)
+        feedback.pushInfo(f"Reading the features in {len(grid)} tiles ({grid.columns} x {grid.rows})")
+        return grid
+
+    def geoPackageReader(self, inputLayer, IDField, CatField, feedback):
+        """
+        Returns a GeoPackageReader of the input layer, or None if the layer
+        has to be read through the QGIS provider: other formats, filtered
+        or edited layers, non polygon tables.
+        """
+        if inputLayer.providerType() != 'ogr' or inputLayer.subsetString() or inputLayer.isModified():
+            return None
+        parts = QgsProviderRegistry.instance().decodeUri('ogr', inputLayer.source())
+        path = parts.get('path') or ''
+        if not path.lower().endswith('.gpkg') or not os.path.isfile(path):
+            return None
+        try:
+            reader = GeoPackageReader(path, parts.get('layerName') or None)
+        except (ValueError, sqlite3.Error) as e:
+            feedback.pushInfo(f"GeoPackage fast path not available, reading through QGIS: {e}")
+            return None
+        columns = reader.columns()
+        missing = [field for field in (IDField, CatField) if field and field not in columns]
+        if missing:
+            reader.close()
+            feedback.pushInfo(f"GeoPackage fast path not available, missing columns: {', '.join(missing)}")
+            return None
+        feedback.pushInfo(f"Reading {path} directly with SQLite")
+        return reader
+
+    def geoPackageRecords(self, reader, IDField, CatField, grid=None, transform=None):
+        attributes = [field for field in (IDField, CatField) if field]
+        if grid is None:
+            rows = reader.records(attributes)
+        else:
+            rows = chain(((fid, wkb, *values) for index, rect in grid.tiles()
+                          for fid, wkb, bounds, *values in reader.rectRecords(rect, attributes)
+                          if grid.owns(index, bounds)),
+                         reader.unindexedRecords(attributes))
+        for fid, wkb, *values in rows:
+            values = dict(zip(attributes, values))
+            if transform is not None and wkb:
+                geom = QgsGeometry()
+                geom.fromWkb(wkb)
+                geom.transform(transform)
+                wkb = bytes(geom.asWkb())
+            parts = decodePolygons(wkb)
+            yield (fid,
+                   wkb,
+                   values[IDField] if IDField else None,
+                   values[CatField] if CatField else None,
+                   polygonArea(parts),
+                   polygonPerimeter(parts),
+                   None)
+
+    def createColumnarExport(self, path, layerCrs):
+        crs = None
+        # GeoParquet wants PROJJSON, only available on recent QGIS versions
+        if hasattr(layerCrs, 'toJsonString'):
+            crs = json.loads(layerCrs.toJsonString()) if layerCrs.isValid() else None
+        return ColumnarExport(path, crs=crs)
+
+    def workingTransform(self, inputLayer, WorkingCrs, AutoCrs, context):
+        """
+        Returns the CRS the calculation works in and the transform of the
+        layer coordinates into it, None when the layer CRS is kept.
+        """
+        layerCrs = inputLayer.crs()
+        crs = WorkingCrs if WorkingCrs.isValid() else None
+        if crs is None and AutoCrs and layerCrs.isGeographic():
+            extent = inputLayer.extent()
+            definition = localCrsDefinition(extent.xMinimum(), extent.yMinimum(), extent.xMaximum(), extent.yMaximum())
+            if definition.startswith('EPSG:'):
+                crs = QgsCoordinateReferenceSystem(definition)
+            else:
+                crs = QgsCoordinateReferenceSystem.fromProj(definition)
+        if crs is None or crs == layerCrs:
+            return layerCrs, None
+        if crs.isGeographic():
+            raise QgsProcessingException(f"The working CRS {crs.authid()} is geographic, choose a projected one")
+        return crs, QgsCoordinateTransform(layerCrs, crs, context.transformContext())
 
-    def angleBetween(self, points):
-        a, b, c = points
-        ang1 = math.degrees(math.atan2(a.y() - b.y(), a.x() - b.x()))
-        ang2 = math.degrees(math.atan2(c.y() - b.y(), c.x() - b.x()))
-        ang = abs(abs(ang2 - ang1) - 180)
-        return ang, ang1, ang2
+    def angleCachePath(self, inputLayer):
+        return self.sidecarPath(inputLayer, 'bpi_cache', 'break_pointer_cache')
 
-    def calculateBPI(self, inputLayer, outputLayer, LowerT, UpperT, InnerRings, IDField, CatField, feedback):
-        data = {}
+    def sidecarPath(self, inputLayer, suffix, folder):
+        """
+        Returns the sidecar SQLite file next to a file based layer, or a
+        file in the QGIS profile folder for other sources.
+        """
+        provider = inputLayer.dataProvider()
+        parts = QgsProviderRegistry.instance().decodeUri(provider.name(), provider.dataSourceUri())
+        path = parts.get('path')
+        if path and os.path.isfile(path):
+            layerName = parts.get('layerName') or ''
+            return f"{path}{'.' + layerName if layerName else ''}.{suffix}.sqlite"
+        name = hashlib.md5(provider.dataSourceUri().encode('utf-8')).hexdigest()
+        return os.path.join(QgsApplication.qgisSettingsDirPath(), folder, f'{name}.sqlite')
+
+    def checkpointJournal(self, inputLayer, LowerT, UpperT, InnerRings, thresholdPairs, histogramBins, tileSize,
+                          fastPath, workingCrs, thinTolerance, removeCollinear):
+        """
+        Returns the checkpoint journal of the layer, resumable only by runs
+        computing the same results in the same feature order.
+        """
+        signature = runSignature(source=inputLayer.dataProvider().dataSourceUri(),
+                                 features=inputLayer.featureCount(),
+                                 LowerT=LowerT, UpperT=UpperT, InnerRings=InnerRings,
+                                 thresholdPairs=thresholdPairs, histogramBins=histogramBins,
+                                 tileSize=tileSize, fastPath=fastPath, crs=workingCrs.toWkt(),
+                                 thinTolerance=thinTolerance, removeCollinear=removeCollinear)
+        return CheckpointJournal(self.sidecarPath(inputLayer, 'bpi_checkpoint', 'break_pointer_checkpoint'), signature)
+
+    def calculateBPI(self, inputLayer, outputLayer, LowerT, UpperT, InnerRings, IDField, CatField, feedback,
+                     batchSize=10000, workers=1, topological=False, columnar=None, cache=None, thresholdPairs=None,
+                     histogramBins=0, data=None, categoryIndex=None, fastPath=False, profile=None,
+                     tileSize=0, journal=None, transform=None, thinTolerance=0, removeCollinear=False,
+                     outputMode=OUTPUT_POINTS, angleColumns=True, resultSinks=(), executor=None):
+        if data is None:
+            data = ResultStore(len(thresholdPairs or ()), histogramSize(histogramBins))
+        profile = StageProfile() if profile is None else profile
+        pointSink = BreakPointSink(outputLayer, batchSize) if outputLayer is not None else None
         categoryCounts = {}
-        categoryPoints = {}
+        categoryIndex = CategoryIndex(topological) if categoryIndex is None else categoryIndex
         totalFeatures = inputLayer.featureCount()
         processedFeatures = 0
 
-        for feature in inputLayer.getFeatures():
-            fid = feature.id()
-            geom = feature.geometry()
-            poly_id = feature[IDField] if IDField else None
-            cat_value = feature[CatField] if CatField else None
-
-            nscp_count = 0
-            area = geom.area()
-            perimeter = geom.length()
-
-            polygons = geom.asMultiPolygon() if geom.isMultipart() else [geom.asPolygon()]
-            if not InnerRings and polygons:
-                max_area = 0
-                max_index = 0
-                for i, part in enumerate(polygons):
-                    ring_geom = QgsGeometry.fromPolygonXY(part)
-                    ring_area = ring_geom.area()
-                    if ring_area > max_area:
-                        max_area = ring_area
-                        max_index = i
-                polygons = [polygons[max_index]]
-
-            for polygon in polygons:
-                points = [QgsPointXY(pt) for ring in polygon for pt in ring if pt is not None]
-                pointsNumber = len(points)
-                if pointsNumber < 3:
-                    continue
-                if points[0] == points[-1]:
-                    points = points[:-1]
-                    pointsNumber = len(points)
-
-                for point in range(pointsNumber):
-                    pointsForAngle = (points[point - 1], points[point], points[(point + 1) % pointsNumber])
-                    if None in pointsForAngle:
-                        continue
-
-                    angle, angle1, angle2 = self.angleBetween(pointsForAngle)
-                    if LowerT <= angle <= UpperT:
-                        nscp_count += 1
-                        pt_xy = (round(pointsForAngle[1].x(), 6), round(pointsForAngle[1].y(), 6))
-
-                        if cat_value is not None:
-                            categoryPoints.setdefault(cat_value, set()).add(pt_xy)
-
-                        feat = QgsFeature()
-                        feat.setGeometry(QgsGeometry.fromPointXY(pointsForAngle[1]))
-                        attributes = [angle1, angle2, angle]
-                        if IDField:
-                            attributes.append(poly_id)
-                        feat.setAttributes(attributes) 
-                        outputLayer.addFeature(feat)
-                    if feedback.isCanceled():
-                        return None, None
-
-            data[fid] = {
-                'count': nscp_count,
-                'area': area,
-                'perimeter': perimeter
-            }
+        records = profile.timed(self.featureRecords(inputLayer, IDField, CatField, fastPath, feedback, tileSize, transform,
+                                                    keepFeatures=any(sink.attributeIndices is not None for sink in resultSinks)), 'read')
+        if thinTolerance or removeCollinear:
+            records = self.thinnedRecords(records, thinTolerance, removeCollinear, profile)
+
+        def compute(records):
+            return breakPointResults(records, LowerT, UpperT, InnerRings, workers=workers,
+                                     onFallback=feedback.pushInfo, cache=cache, thresholdPairs=thresholdPairs,
+                                     histogramBins=histogramBins, executor=executor)
+
+        def journaled(records):
+            try:
+                yield from journal.resume(records, compute)
+            except ValueError as e:
+                # The journal no longer matches the layer, it was cleared
+                raise QgsProcessingException(str(e)) from e
+
+        # Journaled features are replayed, so the point layer and the stores get every feature once
+        results = compute(records) if journal is None else journaled(records)
+        nestedTimes = {name: profile.stages.get(name, 0.0) for name in ('read', 'thinning')}
+        for (fid, wkb, poly_id, cat_value, area, perimeter, feature), points, sweep, histogram in profile.timed(results, 'breakPoints'):
+            nscp_count = len(points[0])
+            profile.count('features')
+            profile.count('vertices', vertexCount(wkb))
+            profile.count('breakPoints', nscp_count)
+            if cat_value is not None:
+                with profile.stage('categories'):
+                    if topological:
+                        parts = decodePolygons(wkb)
+                        if not InnerRings and parts:
+                            parts = largestPart(parts)
+                        for xs, ys, ringOffsets in parts:
+                            categoryIndex.addSegments(xs, ys, ringOffsets, cat_value)
+                    for x, y in zip(points[0], points[1]):
+                        categoryIndex.add((round(x, 6), round(y, 6)), cat_value)
+            if pointSink is not None:
+                with profile.stage('pointSink'):
+                    if outputMode == OUTPUT_MULTIPOINTS:
+                        if nscp_count:
+                            pointSink.addMultiPoint(points[0], points[1], [poly_id if IDField else fid, nscp_count])
+                    else:
+                        for x, y, angle, angle1, angle2 in zip(*points):
+                            attributes = [angle1, angle2, angle] if angleColumns else [angle]
+                            if IDField:
+                                attributes.append(poly_id)
+                            pointSink.addPoint(x, y, attributes)
+            if feedback.isCanceled():
+                return None, None
+
+            with profile.stage('results'):
+                histogram = histogramBytes(histogram) if histogram is not None else None
+                data.add(fid, nscp_count, area, perimeter, sweep, histogram)
+                for resultSink in resultSinks:
+                    if resultSink.attributeIndices is not None:
+                        attributes = feature.attributes()
+                        resultSink.add(fid, nscp_count, area, perimeter, sweep, histogram,
+                                       [attributes[i] for i in resultSink.attributeIndices], feature.geometry())
+                    else:
+                        resultSink.add(fid, nscp_count, area, perimeter, sweep, histogram,
+                                       [fid, poly_id] if IDField else [fid])
+                if columnar:
+                    columnar.addPoints(fid, points)
+                    columnar.addMetrics(fid, nscp_count, perimeter, area)
 
             #if cat_value is not None:
             #    categoryCounts[cat_value] = categoryCounts.get(cat_value, 0) + nscp_count
@@ -271,57 +819,65 @@ class BreakPointIndexAlgorithm(QgsProcessingAlgorithm):
             if processedRatio % 10 == 0:
                 feedback.pushInfo(f'BPI calculation {str(processedRatio)} % completed')
 
-        return data, categoryPoints
+        if pointSink is not None:
+            with profile.stage('pointSink'):
+                pointSink.flush()
+        for resultSink in resultSinks:
+            with profile.stage('results'):
+                resultSink.flush()
+        # Reading and thinning the features happens inside the break point iterator
+        for name, seconds in nestedTimes.items():
+            profile.add('breakPoints', seconds - profile.stages.get(name, 0.0))
+        if thinTolerance or removeCollinear:
+            feedback.pushInfo(f"Vertex thinning removed {profile.counters.get('removedVertices', 0)} vertices")
+        return data, categoryIndex
+
+    def thinnedRecords(self, records, thinTolerance, removeCollinear, profile):
+        """
+        Yields the records with their WKB thinned, counting the removed
+        vertices. The area and the perimeter stay the measures of the
+        original geometry.
+        """
+        for fid, wkb, *values in records:
+            with profile.stage('thinning'):
+                wkb, removed = thinWkb(wkb, thinTolerance, removeCollinear)
+            profile.count('removedVertices', removed)
+            yield (fid, wkb, *values)
 
-    def setAttributes(self, inputLayer, data, attributes):
+    def setAttributes(self, inputLayer, data, attributes, chunkSize=10000, sweepAttributes=None, histogramAttribute=None):
         attributesIndices = [
             inputLayer.fields().indexFromName(attributes[0]),
             inputLayer.fields().indexFromName(attributes[1]),
             inputLayer.fields().indexFromName(attributes[2])
         ]
-        attribute_map = {}
-
-        for feature in inputLayer.getFeatures():
-            fid = feature.id()
-            if fid not in data: 
-                continue
-            
-            count = float(data[fid]['count'])
-            dens_perim = float(data[fid]['count'] / data[fid]['perimeter']) if data[fid]['perimeter'] > 0 else None
-            dens_area = float(data[fid]['count'] / data[fid]['area']) if data[fid]['area'] > 0 else None
-
-            attribute_map[fid] = {
-                attributesIndices[0]: count,
-                attributesIndices[1]: dens_perim,
-                attributesIndices[2]: dens_area
-            }
-        inputLayer.dataProvider().changeAttributeValues(attribute_map)
-
-    def saveTxt(self, categoryPoints, Outxt, feedback):
+        sweepIndices = [[inputLayer.fields().indexFromName(name) for name in names] for names in sweepAttributes or []]
+        histogramIndex = inputLayer.fields().indexFromName(histogramAttribute) if histogramAttribute else -1
+
+        # The fids are known from the calculation, no need to read the layer again
+        for columns in data.columnChunks(chunkSize):
+            attribute_map = {}
+            for fid, count, dens_perim, dens_area, sweep, histogram in attributeRows(columns):
+                attribute_map[fid] = {
+                    attributesIndices[0]: count,
+                    attributesIndices[1]: dens_perim,
+                    attributesIndices[2]: dens_area
+                }
+                for indices, values in zip(sweepIndices, sweep):
+                    attribute_map[fid].update(zip(indices, values))
+                if histogramIndex >= 0 and histogram is not None:
+                    attribute_map[fid][histogramIndex] = QByteArray(histogram)
+            self.commitAttributes(inputLayer, attribute_map)
+
+    def commitAttributes(self, inputLayer, attribute_map):
+        if attribute_map and not inputLayer.dataProvider().changeAttributeValues(attribute_map):
+            raise QgsProcessingException(f'Could not write the BPI attributes of {inputLayer.name()}')
+
+    def saveTxt(self, categoryIndex, Outxt, feedback):
         category_pairs_counts = {}
         category_pairs_lengths = {}
-        categories = list(categoryPoints.keys())
-        for cat1, cat2 in combinations(categories, 2):
-            common_points = categoryPoints[cat1].intersection(categoryPoints[cat2])
-            count_common = len(common_points)
-            category_pairs_counts[(cat1, cat2)] = count_common
-
-            if count_common >= 2:
-                common_list = list(common_points)
-                cx = sum(x for x, y in common_list) / len(common_list)
-                cy = sum(y for x, y in common_list) / len(common_list)
-
-                sorted_pts = sorted(common_list, key=lambda pt: math.atan2(pt[1] - cy, pt[0] - cx))
-
-                total_len = 0.0
-                for i in range(len(sorted_pts) - 1):
-                    x1, y1 = sorted_pts[i]
-                    x2, y2 = sorted_pts[i + 1]
-                    total_len += math.hypot(x2 - x1, y2 - y1)
-
-                category_pairs_lengths[(cat1, cat2)] = total_len
-            else:
-                category_pairs_lengths[(cat1, cat2)] = 0.0
+        for pair, (count_common, total_len) in categoryIndex.pairMetrics().items():
+            category_pairs_counts[pair] = count_common
+            category_pairs_lengths[pair] = total_len
         with open(Outxt, 'w', encoding='utf-8') as f:
             f.write("Category1\tCategory2\tShared break points\tShared edge lenght (m)\tDensity (point / 100m)\n")
             for (cat1, cat2) in sorted(category_pairs_counts, key=lambda x: -category_pairs_counts[x]):
@@ -343,4 +899,11 @@ class BreakPointIndexAlgorithm(QgsProcessingAlgorithm):
                 density = cnt / (length_m / 100) if length_m > 0 else 0.0
                 f.write(f"<tr><td>{cat1}</td><td>{cat2}</td><td>{cnt}</td><td>{length_m:.2f}</td><td>{density:.2f}</td></tr>")
 
-            f.write("</table></body></html>")
\ No newline at end of file
+            f.write("</table></body></html>")
+
+    def savePairMatrix(self, categoryIndex, path):
+        categories, rows, cols, counts = categoryIndex.sparseMatrix()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("Row\tColumn\tCategory1\tCategory2\tShared break points\n")
+            for i, j, cnt in zip(rows, cols, counts):
+                f.write(f"{i}\t{j}\t{categories[i]}\t{categories[j]}\t{cnt}\n")
@@ -0,0 +1,215 @@
+"""
+Break Point Index of several polygon layers in one run, like the epochs of
+a land cover time series.
+
+The layers share one worker pool, started once for the whole batch, and
+the same parameters, sinks and field setup. Every layer gets its own break
+point layer in the output folder, and one summary table collects the layer
+level totals of every epoch.
+"""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+__revision__ = '$Format:%H$'
+
+import os, re, datetime
+from qgis.PyQt.QtCore import QVariant
+from qgis.core import (QgsWkbTypes,
+                       QgsFeature,
+                       QgsField,
+                       QgsFields,
+                       QgsFeatureSink,
+                       QgsProcessing,
+                       QgsProcessingUtils,
+                       QgsProcessingParameterMultipleLayers,
+                       QgsProcessingParameterFeatureSink,
+                       QgsProcessingParameterFolderDestination,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterBoolean,
+                       QgsProcessingParameterString,
+                       QgsProcessingParameterEnum,
+                       QgsProcessingParameterDefinition,
+                       QgsProcessingException,
+                       QgsProcessingMultiStepFeedback)
+from .break_pointer_algorithm import (BreakPointIndexAlgorithm, OUTPUT_POINTS, OUTPUT_MULTIPOINTS, OUTPUT_NONE,
+                                      OUTPUT_MODES)
+from .break_pointer_parallel import createExecutor
+from .break_pointer_profile import StageProfile
+from .break_pointer_results import resultSummary
+
+# Columns of the per-epoch summary table, after epoch and layer
+SUMMARY_FIELDS = [('features', QVariant.LongLong), ('break_points', QVariant.LongLong),
+                  ('perimeter', QVariant.Double), ('area', QVariant.Double), ('mean_bpi', QVariant.Double),
+                  ('dens_perim', QVariant.Double), ('dens_area', QVariant.Double), ('seconds', QVariant.Double)]
+SUMMARY_KEYS = ['features', 'breakPoints', 'perimeter', 'area', 'meanBpi', 'densPerim', 'densArea']
+
+
+class BreakPointIndexBatchAlgorithm(BreakPointIndexAlgorithm):
+
+    HELP_FILE = 'shorthelp_batch.txt'
+
+    def initAlgorithm(self, config=None):
+        self.addParameter(QgsProcessingParameterMultipleLayers('Layers', 'Input layers (one per epoch)',
+                                                               layerType=QgsProcessing.TypeVectorPolygon))
+        self.addParameter(QgsProcessingParameterNumber('LowerT', 'Lower tolerance',
+                                                       type=QgsProcessingParameterNumber.Integer,
+                                                       minValue=0, maxValue=360, defaultValue=20))
+        self.addParameter(QgsProcessingParameterNumber('UpperT', 'Upper tolerance',
+                                                       type=QgsProcessingParameterNumber.Integer,
+                                                       minValue=0, maxValue=360, defaultValue=160))
+        self.addParameter(QgsProcessingParameterBoolean('InnerRings', 'Use inner rings for the index calculation',
+                                                        defaultValue=True))
+        self.addParameter(QgsProcessingParameterString('BPIField', 'BPI field name in the result file', defaultValue='bpi'))
+        self.addParameter(QgsProcessingParameterString('PerimField', 'Perimeter density field name in the result file', defaultValue='dens_perim'))
+        self.addParameter(QgsProcessingParameterString('AreaDField', 'Area density field name in the result file', defaultValue='dens_area'))
+        self.addParameter(QgsProcessingParameterString('IDField', 'Polygons ID field name, present in every layer (optional)',
+                                                       optional=True))
+        self.addParameter(QgsProcessingParameterFolderDestination('OutputFolder', 'Folder of the break point layers',
+                                                                  optional=True, createByDefault=True))
+        self.addParameter(QgsProcessingParameterFeatureSink('Summary', 'Per-epoch summary table',
+                                                            type=QgsProcessing.TypeVector))
+
+        output_mode = QgsProcessingParameterEnum('OutputMode', 'Break point layer granularity', options=OUTPUT_MODES,
+                                                 defaultValue=OUTPUT_POINTS)
+        output_mode.setFlags(output_mode.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(output_mode)
+
+        update_input = QgsProcessingParameterBoolean('UpdateInput', 'Write the BPI fields into the input layers',
+                                                     defaultValue=True)
+        update_input.setFlags(update_input.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(update_input)
+
+        batch_size = QgsProcessingParameterNumber('BatchSize', 'Break points written to the point layer in one batch',
+                                                  type=QgsProcessingParameterNumber.Integer,
+                                                  minValue=1, defaultValue=10000)
+        batch_size.setFlags(batch_size.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(batch_size)
+
+        workers = QgsProcessingParameterNumber('Workers', 'Number of workers shared by every layer (0 uses every CPU core)',
+                                               type=QgsProcessingParameterNumber.Integer,
+                                               minValue=0, defaultValue=0)
+        workers.setFlags(workers.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(workers)
+
+    def name(self):
+        return 'BreakPointIndexBatch'
+
+    def displayName(self):
+        return self.tr('BreakPointIndex (batch of layers)')
+
+    def createInstance(self):
+        return BreakPointIndexBatchAlgorithm()
+
+    def processAlgorithm(self, parameters, context, model_feedback):
+        results = {}
+        layers = self.parameterAsLayerList(parameters, 'Layers', context)
+        LowerT = self.parameterAsInt(parameters, 'LowerT', context)
+        UpperT = self.parameterAsInt(parameters, 'UpperT', context)
+        InnerRings = self.parameterAsBoolean(parameters, 'InnerRings', context)
+        BPIField = self.parameterAsString(parameters, 'BPIField', context)
+        PerimField = self.parameterAsString(parameters, 'PerimField', context)
+        AreaDField = self.parameterAsString(parameters, 'AreaDField', context)
+        IDField = self.parameterAsString(parameters, 'IDField', context)
+        OutputFolder = self.parameterAsFileOutput(parameters, 'OutputFolder', context)
+        OutputMode = self.parameterAsEnum(parameters, 'OutputMode', context)
+        UpdateInput = self.parameterAsBoolean(parameters, 'UpdateInput', context)
+        BatchSize = self.parameterAsInt(parameters, 'BatchSize', context)
+        Workers = self.parameterAsInt(parameters, 'Workers', context) or os.cpu_count() or 1
+        if not layers:
+            raise QgsProcessingException('No input layers given')
+        for layer in layers:
+            if IDField and layer.fields().indexFromName(IDField) < 0:
+                raise QgsProcessingException(f"Field '{IDField}' is missing from {layer.name()}")
+        if OutputMode != OUTPUT_NONE and OutputFolder:
+            os.makedirs(OutputFolder, exist_ok=True)
+
+        feedback = QgsProcessingMultiStepFeedback(len(layers), model_feedback)
+        startTime = datetime.datetime.now()
+        feedback.pushInfo(f"Start Time: {startTime}")
+        feedback.pushInfo(f"Using angle thresholds: {LowerT}° to {UpperT}° on {len(layers)} layers")
+
+        summaryFields = QgsFields()
+        summaryFields.append(QgsField('epoch', QVariant.Int))
+        summaryFields.append(QgsField('layer', QVariant.String))
+        for name, fieldType in SUMMARY_FIELDS:
+            summaryFields.append(QgsField(name, fieldType))
+        summaryFields.append(QgsField('points', QVariant.String))
+        summarySink, summaryPath = self.parameterAsSink(parameters, 'Summary', context, summaryFields,
+                                                        QgsWkbTypes.NoGeometry)
+
+        executor = None
+        if Workers > 1:
+            try:
+                executor = createExecutor(Workers)
+                feedback.pushInfo(f"Shared worker pool of {Workers} processes")
+            except (OSError, ValueError, ImportError, NotImplementedError) as e:
+                feedback.pushInfo(f"Parallel mode is not available, running serially: {e}")
+        outputPaths = []
+        try:
+            for epoch, layer in enumerate(layers):
+                feedback.setCurrentStep(epoch)
+                if feedback.isCanceled():
+                    return None
+                layerStart = datetime.datetime.now()
+                feedback.pushInfo(f"Epoch {epoch}: {layer.name()}")
+                if UpdateInput:
+                    self.createAttributeFields(layer, [BPIField, PerimField, AreaDField], feedback)
+                pointLayer, pointPath = self.createEpochPointLayer(OutputFolder, epoch, layer, IDField, OutputMode,
+                                                                   BPIField, context)
+                profile = StageProfile()
+                try:
+                    data, categoryIndex = self.calculateBPI(layer, pointLayer, LowerT, UpperT, InnerRings, IDField, None,
+                                                             feedback, batchSize=BatchSize, workers=Workers,
+                                                             profile=profile, outputMode=OutputMode,
+                                                             executor=executor)
+                finally:
+                    profile.close()
+                del pointLayer
+                if data is None or feedback.isCanceled():
+                    return None
+                if UpdateInput:
+                    self.setAttributes(layer, data, [BPIField, PerimField, AreaDField])
+                summary = resultSummary(data)
+                data.close()
+
+                seconds = (datetime.datetime.now() - layerStart).total_seconds()
+                feature = QgsFeature(summaryFields)
+                feature.setAttributes([epoch, layer.name()] + [summary[key] for key in SUMMARY_KEYS]
+                                      + [seconds, pointPath])
+                summarySink.addFeature(feature, QgsFeatureSink.FastInsert)
+                feedback.pushInfo(f"Epoch {epoch}: {summary['features']} features, {summary['breakPoints']} break points in {seconds:.1f} s")
+                if pointPath:
+                    outputPaths.append(pointPath)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        endTime = datetime.datetime.now()
+        feedback.pushInfo(f"Calculation completed: {endTime} (Duration: {endTime - startTime})")
+        results['Summary'] = summaryPath
+        results['OutputLayers'] = outputPaths
+        if OutputFolder:
+            results['OutputFolder'] = OutputFolder
+        return results
+
+    def createEpochPointLayer(self, folder, epoch, layer, IDField, outputMode, bpiField, context):
+        """
+        Returns the sink of the break point GeoPackage of one epoch in the
+        output folder and its path, or (None, None) without a point layer.
+        """
+        if outputMode == OUTPUT_NONE or not folder:
+            return None, None
+        name = re.sub(r'[^\w-]+', '_', layer.name()).strip('_') or 'layer'
+        path = os.path.join(folder, f"{epoch:02d}_{name}_breakpoints.gpkg")
+        sink, path = QgsProcessingUtils.createFeatureSink(
+            path,
+            context,
+            self.outputPointFields(IDField, outputMode, bpiField=bpiField),
+            QgsWkbTypes.MultiPoint if outputMode == OUTPUT_MULTIPOINTS else QgsWkbTypes.Point,
+            layer.crs()
+        )
+        if sink is None:
+            raise QgsProcessingException(f"Could not create the break point layer {path}")
+        return sink, path
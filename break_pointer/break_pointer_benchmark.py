@@ -0,0 +1,194 @@
+"""
+Benchmarks of the calculation stages on synthetic landscapes.
+
+Runs the headless counterparts of the calculateBPI, setAttributes and
+saveTxt stages on the generators of break_pointer_synthetic across size
+tiers and writes the timings as JSON, to compare releases:
+
+    python -m break_pointer.break_pointer_benchmark --tiers small,medium --output bpi.json
+
+Reading the layer and writing the QGIS outputs are not part of the timed
+stages. Every result also holds the kernel timings of the break point
+chunks with numpy and in pure Python, the numpy one should be the faster.
+"""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+__revision__ = '$Format:%H$'
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import datetime
+
+from .break_pointer_wkb import decodePolygons
+from .break_pointer_engine import polygonArea, polygonPerimeter, largestPart, chunkResults
+from .break_pointer_parallel import breakPointResults, chunks, CHUNK_SIZE
+from .break_pointer_categories import CategoryIndex
+from .break_pointer_results import ResultStore, attributeRows
+from . import break_pointer_synthetic as synthetic
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Features of the layer generators and vertices of the single ring per tier
+TIERS = {
+    'small': {'features': 1000, 'vertices': 10000},
+    'medium': {'features': 10000, 'vertices': 100000},
+    'large': {'features': 100000, 'vertices': 1000000},
+}
+GENERATORS = {
+    'star': lambda tier, seed: synthetic.starPolygons(tier['features'], seed=seed),
+    'tessellation': lambda tier, seed: synthetic.tessellation(tier['features'], seed=seed),
+    'holes': lambda tier, seed: synthetic.holedMultiPolygons(tier['features'], seed=seed),
+    'ring': lambda tier, seed: synthetic.largeRing(tier['vertices'], seed=seed),
+}
+
+
+def pluginVersion():
+    try:
+        with open(os.path.join(os.path.dirname(__file__), 'metadata.txt'), encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('version='):
+                    return line.split('=', 1)[1].strip()
+    except OSError:
+        pass
+    return None
+
+
+def runStages(records, LowerT=20, UpperT=160, InnerRings=True, workers=1, topological=True):
+    """
+    Runs every stage once on (wkb, category) records. Returns the stage
+    timings in seconds and the feature, vertex and break point counts.
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    decoded = [decodePolygons(wkb) for wkb, category in records]
+    timings['decode'] = time.perf_counter() - start
+    vertices = sum(len(xs) for parts in decoded for xs, ys, ringOffsets in parts)
+
+    start = time.perf_counter()
+    measures = [(polygonArea(parts), polygonPerimeter(parts)) for parts in decoded]
+    timings['measure'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = list(breakPointResults(((fid, wkb) for fid, (wkb, category) in enumerate(records)), LowerT, UpperT,
+                                     InnerRings, workers=workers))
+    timings['breakPoints'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    categoryIndex = CategoryIndex(topological)
+    for ((fid, wkb), points, counts, histogram), (wkb, category), parts in zip(results, records, decoded):
+        if topological:
+            for xs, ys, ringOffsets in (parts if InnerRings or not parts else largestPart(parts)):
+                categoryIndex.addSegments(xs, ys, ringOffsets, category)
+        for x, y in zip(points[0], points[1]):
+            categoryIndex.add((round(x, 6), round(y, 6)), category)
+    timings['categoryIndex'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store = ResultStore()
+    for ((fid, wkb), points, counts, histogram), (area, perimeter) in zip(results, measures):
+        store.add(fid, len(points[0]), area, perimeter)
+    timings['resultStore'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for columns in store.columnChunks(10000):
+        attribute_map = {fid: {0: count, 1: dens_perim, 2: dens_area}
+                         for fid, count, dens_perim, dens_area, sweep, histogram in attributeRows(columns)}
+    timings['setAttributes'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    categoryIndex.pairMetrics()
+    timings['saveTxt'] = time.perf_counter() - start
+
+    timings['total'] = sum(timings.values())
+    return timings, {'features': len(records), 'vertices': vertices,
+                     'breakPoints': sum(len(points[0]) for record, points, counts, histogram in results)}
+
+
+def kernelTimings(records, LowerT=20, UpperT=160, InnerRings=True):
+    """
+    Returns the seconds chunkResults takes over the decoded records in
+    CHUNK_SIZE chunks with the numpy kernel (None without numpy) and with
+    the pure Python path, to check that the numpy kernel pays off.
+    """
+    decoded = [decodePolygons(wkb) for wkb, category in records]
+    timings = {}
+    for name, smallChunk in (('numpy', None), ('python', float('inf'))):
+        if name == 'numpy' and np is None:
+            timings[name] = None
+            continue
+        start = time.perf_counter()
+        for chunk in chunks(decoded, CHUNK_SIZE):
+            chunkResults(chunk, LowerT, UpperT, InnerRings, smallChunk=smallChunk)
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def runBenchmarks(tiers=('small',), generators=tuple(GENERATORS), workers=1, seed=0, repeat=1, tierSizes=None):
+    """
+    Returns the benchmark report: environment details and for every
+    generator and tier the best stage timings out of repeat runs, with
+    the throughput of the whole run and the best kernelTimings.
+    """
+    tierSizes = tierSizes or TIERS
+    report = {
+        'version': pluginVersion(),
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__ if np is not None else None,
+        'platform': platform.platform(),
+        'cpuCount': os.cpu_count(),
+        'workers': workers,
+        'results': [],
+    }
+    for tier in tiers:
+        for name in generators:
+            start = time.perf_counter()
+            records = GENERATORS[name](tierSizes[tier], seed)
+            generation = time.perf_counter() - start
+            best = kernels = None
+            for _ in range(max(1, repeat)):
+                timings, counts = runStages(records, workers=workers)
+                best = timings if best is None else {stage: min(best[stage], timings[stage]) for stage in best}
+                timings = kernelTimings(records)
+                kernels = timings if kernels is None else {
+                    kernel: min(kernels[kernel], timings[kernel]) if timings[kernel] is not None else None
+                    for kernel in kernels}
+            report['results'].append(dict(
+                generator=name, tier=tier, generation=generation, stages=best, kernels=kernels,
+                verticesPerSecond=counts['vertices'] / best['total'] if best['total'] else None,
+                **counts))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Break Point Index stage benchmarks on synthetic landscapes')
+    parser.add_argument('--tiers', default='small', help=f'comma separated tiers of {", ".join(TIERS)}')
+    parser.add_argument('--generators', default=','.join(GENERATORS),
+                        help=f'comma separated generators of {", ".join(GENERATORS)}')
+    parser.add_argument('--workers', type=int, default=1, help='worker processes, 0 uses every CPU core')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per case, the fastest one is kept')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='JSON file to write, printed when missing')
+    args = parser.parse_args(argv)
+    report = runBenchmarks(args.tiers.split(','), args.generators.split(','), args.workers, args.seed, args.repeat)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
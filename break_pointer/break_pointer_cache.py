@@ -0,0 +1,131 @@
+"""
+Persistent cache of the per vertex angles of polygon geometries.
+
+The featureAngles arrays of a feature are stored in an SQLite file keyed by
+a hash of its WKB, so reruns on the same layer with other thresholds only
+have to filter the cached angles. Entries not used for the most runs are
+evicted once the cache grows over its size limit.
+"""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+__revision__ = '$Format:%H$'
+
+import os
+import sys
+import sqlite3
+import hashlib
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+COLUMNS = 5
+
+
+class AngleCache:
+    """
+    SQLite backed featureAngles cache limited to maxBytes of angle data.
+    Every run gets a new stamp, the entries read or written during the run
+    are marked with it and the oldest stamps are evicted first.
+    """
+
+    def __init__(self, path, maxBytes=1024 * 1024 * 1024, commitEvery=1000):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.path = path
+        self.maxBytes = maxBytes
+        self.commitEvery = commitEvery
+        self.hits = 0
+        self.misses = 0
+        self.inserts = []
+        self.used = []
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS angles '
+                                '(key BLOB PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL, used INTEGER NOT NULL)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS angles_used ON angles (used)')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS runs (stamp INTEGER)')
+        self.connection.execute('INSERT INTO runs (stamp) VALUES ((SELECT COALESCE(MAX(stamp), 0) + 1 FROM runs))')
+        self.stamp = self.connection.execute('SELECT MAX(stamp) FROM runs').fetchone()[0]
+        self.connection.commit()
+
+    @staticmethod
+    def key(wkb, InnerRings):
+        return hashlib.blake2b(wkb, digest_size=16, person=b'bpi-inner' if InnerRings else b'bpi-outer').digest()
+
+    @staticmethod
+    def pack(angles):
+        if np is not None:
+            return np.concatenate([np.asarray(column, dtype='<f8') for column in angles]).tobytes()
+        data = array('d')
+        for column in angles:
+            data.extend(column)
+        if sys.byteorder != 'little':
+            data.byteswap()
+        return data.tobytes()
+
+    @staticmethod
+    def unpack(blob):
+        if np is not None:
+            return tuple(np.frombuffer(blob, dtype='<f8').reshape(COLUMNS, -1))
+        data = array('d', blob)
+        if sys.byteorder != 'little':
+            data.byteswap()
+        n = len(data) // COLUMNS
+        return tuple(data[i * n:(i + 1) * n] for i in range(COLUMNS))
+
+    def get(self, key):
+        row = self.connection.execute('SELECT data FROM angles WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.used.append((self.stamp, key))
+        if len(self.used) >= self.commitEvery:
+            self.commit()
+        return self.unpack(row[0])
+
+    def put(self, key, angles):
+        data = self.pack(angles)
+        self.inserts.append((key, data, len(data), self.stamp))
+        if len(self.inserts) >= self.commitEvery:
+            self.commit()
+
+    def commit(self):
+        with self.connection:
+            if self.inserts:
+                self.connection.executemany('INSERT OR REPLACE INTO angles (key, data, size, used) VALUES (?, ?, ?, ?)',
+                                            self.inserts)
+            if self.used:
+                self.connection.executemany('UPDATE angles SET used = ? WHERE key = ?', self.used)
+        self.inserts = []
+        self.used = []
+
+    def evict(self):
+        """
+        Deletes the least recently used entries until the cache fits into
+        maxBytes. Returns the number of deleted entries.
+        """
+        total = self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM angles').fetchone()[0]
+        if total <= self.maxBytes:
+            return 0
+        victims = []
+        for key, size in self.connection.execute('SELECT key, size FROM angles ORDER BY used, rowid'):
+            if total <= self.maxBytes:
+                break
+            victims.append((key,))
+            total -= size
+        with self.connection:
+            self.connection.executemany('DELETE FROM angles WHERE key = ?', victims)
+        return len(victims)
+
+    def close(self):
+        self.commit()
+        evicted = self.evict()
+        self.connection.close()
+        return evicted
@@ -0,0 +1,302 @@
+"""
+Inverted index of the break points shared between land cover categories.
+
+Every rounded break point is stored once with the categories it was found
+in, so the shared points of all category pairs come out of one pass over
+the index. In topological mode the boundary segments are indexed the same
+way, giving the true length of the edges shared by the category pairs.
+DiskCategoryIndex keeps the same index in a temporary SQLite file for
+layers whose break points do not fit into memory, the category report
+included.
+"""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+__revision__ = '$Format:%H$'
+
+import os
+import math
+import sqlite3
+import tempfile
+from itertools import combinations
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def ringSegments(xs, ys, ringOffsets):
+    """
+    Yields the boundary segments of a polygon part as (x1, y1, x2, y2)
+    tuples of coordinates rounded to 6 decimals, the endpoints in
+    ascending order so both neighbours of an edge produce the same key.
+    Zero length segments are skipped.
+    """
+    for ring in range(len(ringOffsets) - 1):
+        start, end = ringOffsets[ring], ringOffsets[ring + 1]
+        if np is not None:
+            rx = np.round(np.asarray(xs[start:end], dtype=np.float64), 6).tolist()
+            ry = np.round(np.asarray(ys[start:end], dtype=np.float64), 6).tolist()
+        else:
+            rx = [round(x, 6) for x in xs[start:end]]
+            ry = [round(y, 6) for y in ys[start:end]]
+        for p, q in zip(zip(rx, ry), zip(rx[1:], ry[1:])):
+            if p < q:
+                yield p + q
+            elif q < p:
+                yield q + p
+
+
+def centroidLength(points):
+    """
+    Returns the length of the path through the points ordered by their
+    direction from the centroid, the shared edge estimate of a pair.
+    """
+    if len(points) < 2:
+        return 0.0
+    cx = sum(x for x, y in points) / len(points)
+    cy = sum(y for x, y in points) / len(points)
+    sorted_pts = sorted(points, key=lambda pt: math.atan2(pt[1] - cy, pt[0] - cx))
+    total_len = 0.0
+    for k in range(len(sorted_pts) - 1):
+        x1, y1 = sorted_pts[k]
+        x2, y2 = sorted_pts[k + 1]
+        total_len += math.hypot(x2 - x1, y2 - y1)
+    return total_len
+
+
+class CategoryIndex:
+    """
+    Maps every break point to the categories it belongs to. Categories are
+    numbered in the order they are first seen, a point found in a single
+    category keeps the bare number, a shared point a set of them. With
+    topological set the boundary segments are mapped the same way.
+    """
+
+    def __init__(self, topological=False):
+        self.categories = {}
+        self.points = {}
+        self.segments = {}
+        self.topological = topological
+
+    def __len__(self):
+        return len(self.categories)
+
+    def _store(self, mapping, key, index):
+        current = mapping.get(key)
+        if current is None:
+            mapping[key] = index
+        elif isinstance(current, set):
+            current.add(index)
+        elif current != index:
+            mapping[key] = {current, index}
+
+    def add(self, point, category):
+        self._store(self.points, point, self.categories.setdefault(category, len(self.categories)))
+
+    def addSegments(self, xs, ys, ringOffsets, category):
+        index = self.categories.setdefault(category, len(self.categories))
+        for segment in ringSegments(xs, ys, ringOffsets):
+            self._store(self.segments, segment, index)
+
+    def categoryList(self):
+        return list(self.categories)
+
+    def close(self):
+        pass
+
+    def sharedPoints(self):
+        """
+        Yields (point, sorted category numbers) of the points found in more
+        than one category.
+        """
+        for point, value in self.points.items():
+            if isinstance(value, set):
+                yield point, sorted(value)
+
+    def sharedSegments(self):
+        """
+        Yields (segment, sorted category numbers) of the boundary segments
+        found in more than one category.
+        """
+        for segment, value in self.segments.items():
+            if isinstance(value, set):
+                yield segment, sorted(value)
+
+    def pairPoints(self):
+        """
+        Returns {(i, j): [points]} for the category number pairs, i < j,
+        sharing at least one point.
+        """
+        pairs = {}
+        for point, numbers in self.sharedPoints():
+            for pair in combinations(numbers, 2):
+                pairs.setdefault(pair, []).append(point)
+        return pairs
+
+    def pairCounts(self):
+        """
+        Returns {(i, j): count} for the category number pairs sharing at
+        least one point.
+        """
+        counts = {}
+        for point, numbers in self.sharedPoints():
+            for pair in combinations(numbers, 2):
+                counts[pair] = counts.get(pair, 0) + 1
+        return counts
+
+    def pairLengths(self):
+        """
+        Returns {(i, j): length} of the boundary segments shared by the
+        category number pairs, i < j.
+        """
+        lengths = {}
+        for (x1, y1, x2, y2), numbers in self.sharedSegments():
+            length = math.hypot(x2 - x1, y2 - y1)
+            for pair in combinations(numbers, 2):
+                lengths[pair] = lengths.get(pair, 0.0) + length
+        return lengths
+
+    def pairGroups(self):
+        """
+        Yields ((i, j), [points]) for the category number pairs sharing at
+        least one point, the points in the order they were first added.
+        """
+        yield from self.pairPoints().items()
+
+    def pairMetrics(self):
+        """
+        Returns {(cat1, cat2): (shared points, shared edge length)} for every
+        category pair in the order of combinations(categories, 2). The edge
+        length is measured from the shared segments in topological mode,
+        otherwise estimated from the shared points ordered around their
+        centroid.
+        """
+        categories = self.categoryList()
+        pair_counts = self.pairCounts()
+        if self.topological:
+            pair_lengths = self.pairLengths()
+        else:
+            pair_lengths = {pair: centroidLength(points) for pair, points in self.pairGroups()}
+        return {(categories[i], categories[j]): (pair_counts.get((i, j), 0), pair_lengths.get((i, j), 0.0))
+                for i, j in combinations(range(len(categories)), 2)}
+
+    def categoryPairsCounts(self):
+        """
+        Returns {(cat1, cat2): count} for every category pair, zeros
+        included, in the order of combinations(categories, 2).
+        """
+        counts = self.pairCounts()
+        categories = self.categoryList()
+        return {(categories[i], categories[j]): counts.get((i, j), 0)
+                for i, j in combinations(range(len(categories)), 2)}
+
+    def sparseMatrix(self):
+        """
+        Returns (categories, rows, cols, counts), the nonzero upper triangle
+        of the symmetric category pair matrix in coordinate format, ordered
+        by row and column.
+        """
+        counts = self.pairCounts()
+        rows, cols, values = [], [], []
+        for (i, j) in sorted(counts):
+            rows.append(i)
+            cols.append(j)
+            values.append(counts[(i, j)])
+        return self.categoryList(), rows, cols, values
+
+
+class DiskCategoryIndex(CategoryIndex):
+    """
+    CategoryIndex keeping the points and segments in a temporary SQLite
+    file. The rows are inserted in batches of bufferRows and SQLite uses at
+    most cacheBytes of page cache, so the memory use does not grow with the
+    number of break points. The shared points come out in the order they
+    were first added, like from CategoryIndex.
+    """
+
+    def __init__(self, topological=False, bufferRows=100000, cacheBytes=64 * 1024 * 1024, folder=None):
+        super().__init__(topological)
+        self.bufferRows = bufferRows
+        handle, self.path = tempfile.mkstemp(prefix='bpi_categories_', suffix='.sqlite', dir=folder)
+        os.close(handle)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute(f'PRAGMA cache_size = {-max(1, cacheBytes // 1024)}')
+        self.connection.execute('PRAGMA journal_mode = OFF')
+        self.connection.execute('PRAGMA synchronous = OFF')
+        self.connection.execute('PRAGMA temp_store = FILE')
+        self.connection.execute('CREATE TABLE points (x REAL, y REAL, c INTEGER, UNIQUE (x, y, c))')
+        self.connection.execute('CREATE TABLE segments (x1 REAL, y1 REAL, x2 REAL, y2 REAL, c INTEGER, '
+                                'UNIQUE (x1, y1, x2, y2, c))')
+        self.pointRows = []
+        self.segmentRows = []
+
+    def add(self, point, category):
+        self.pointRows.append(point + (self.categories.setdefault(category, len(self.categories)),))
+        if len(self.pointRows) >= self.bufferRows:
+            self.flush()
+
+    def addSegments(self, xs, ys, ringOffsets, category):
+        index = self.categories.setdefault(category, len(self.categories))
+        self.segmentRows.extend(segment + (index,) for segment in ringSegments(xs, ys, ringOffsets))
+        if len(self.segmentRows) >= self.bufferRows:
+            self.flush()
+
+    def flush(self):
+        with self.connection:
+            if self.pointRows:
+                self.connection.executemany('INSERT OR IGNORE INTO points VALUES (?, ?, ?)', self.pointRows)
+            if self.segmentRows:
+                self.connection.executemany('INSERT OR IGNORE INTO segments VALUES (?, ?, ?, ?, ?)',
+                                            self.segmentRows)
+        self.pointRows = []
+        self.segmentRows = []
+
+    def sharedPoints(self):
+        self.flush()
+        query = ('SELECT x, y, GROUP_CONCAT(c) FROM points GROUP BY x, y HAVING COUNT(*) > 1 '
+                 'ORDER BY MIN(rowid)')
+        for x, y, numbers in self.connection.execute(query):
+            yield (x, y), sorted(int(number) for number in numbers.split(','))
+
+    def sharedSegments(self):
+        self.flush()
+        query = ('SELECT x1, y1, x2, y2, GROUP_CONCAT(c) FROM segments GROUP BY x1, y1, x2, y2 '
+                 'HAVING COUNT(*) > 1')
+        for x1, y1, x2, y2, numbers in self.connection.execute(query):
+            yield (x1, y1, x2, y2), sorted(int(number) for number in numbers.split(','))
+
+    def pairGroups(self):
+        """
+        Yields the points of one category pair at a time: the shared
+        points are written to a pair table first and read back sorted by
+        pair, so only the largest pair is held in memory.
+        """
+        self.connection.execute('DROP TABLE IF EXISTS pairs')
+        self.connection.execute('CREATE TABLE pairs (i INTEGER, j INTEGER, x REAL, y REAL)')
+        rows = []
+        for point, numbers in self.sharedPoints():
+            rows.extend(pair + point for pair in combinations(numbers, 2))
+            if len(rows) >= self.bufferRows:
+                self.connection.executemany('INSERT INTO pairs VALUES (?, ?, ?, ?)', rows)
+                rows = []
+        if rows:
+            self.connection.executemany('INSERT INTO pairs VALUES (?, ?, ?, ?)', rows)
+        self.connection.commit()
+        pair, points = None, []
+        for i, j, x, y in self.connection.execute('SELECT i, j, x, y FROM pairs ORDER BY i, j, rowid'):
+            if (i, j) != pair:
+                if points:
+                    yield pair, points
+                pair, points = (i, j), []
+            points.append((x, y))
+        if points:
+            yield pair, points
+        self.connection.execute('DROP TABLE pairs')
+
+    def close(self):
+        self.connection.close()
+        os.remove(self.path)
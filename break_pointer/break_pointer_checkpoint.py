@@ -0,0 +1,165 @@
+"""
+Checkpoint journal of a running break point calculation.
+
+The breakPointResults results are written to an SQLite file in the order
+the features were read, and committed every few thousand features. Since
+the results come in read order, the journaled features are always the first
+ones read, so a rerun with the same parameters replays them from the
+journal and only computes the rest. Every journaled feature keeps a hash of
+its geometry, a replayed feature has to match it.
+"""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+__revision__ = '$Format:%H$'
+
+import os
+import json
+import time
+import struct
+import sqlite3
+import hashlib
+
+from .break_pointer_engine import histogramBytes, histogramFromBytes
+
+POINT_COLUMNS = 5
+
+
+def runSignature(**values):
+    """
+    Returns a digest of the parameters a journal can only be resumed with.
+    """
+    text = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def geometryKey(wkb):
+    return hashlib.blake2b(wkb, digest_size=16).digest()
+
+
+def packPoints(points):
+    values = [float(value) for column in points for value in column]
+    return struct.pack(f'<{len(values)}d', *values)
+
+
+def unpackPoints(blob):
+    values = struct.unpack(f'<{len(blob) // 8}d', blob)
+    n = len(values) // POINT_COLUMNS
+    return tuple(list(values[i * n:(i + 1) * n]) for i in range(POINT_COLUMNS))
+
+
+class CheckpointJournal:
+    """
+    SQLite journal of the breakPointResults results of a run with the
+    given signature. A journal written with another signature is cleared.
+    Pending results are committed after commitEvery features or
+    commitSeconds seconds, whichever comes first.
+    """
+
+    def __init__(self, path, signature, commitEvery=5000, commitSeconds=60):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.path = path
+        self.signature = signature
+        self.commitEvery = commitEvery
+        self.commitSeconds = commitSeconds
+        self.pending = []
+        self.lastCommit = time.monotonic()
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS results (seq INTEGER PRIMARY KEY, fid INTEGER NOT NULL, '
+                                'key BLOB NOT NULL, points BLOB NOT NULL, counts BLOB, histogram BLOB)')
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+        if row is None or row[0] != signature:
+            self.reset()
+        self.completed, self.pointCount = self.position()
+
+    def position(self):
+        """
+        Returns the number of journaled features and break points, after
+        checking that the break point count stored with the last commit
+        matches the journaled points.
+        """
+        completed = self.connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+        pointCount = self.connection.execute(
+            f'SELECT COALESCE(SUM(LENGTH(points)), 0) / {8 * POINT_COLUMNS} FROM results').fetchone()[0]
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'points'").fetchone()
+        if completed and (row is None or int(row[0]) != pointCount):
+            self.reset()
+            return 0, 0
+        return completed, pointCount
+
+    def reset(self):
+        with self.connection:
+            self.connection.execute('DELETE FROM results')
+            self.connection.execute('DELETE FROM meta')
+            self.connection.execute("INSERT INTO meta VALUES ('signature', ?)", (self.signature,))
+            self.connection.execute("INSERT INTO meta VALUES ('points', '0')")
+        self.pending = []
+        self.completed = 0
+        self.pointCount = 0
+
+    def add(self, fid, wkb, points, counts=None, histogram=None):
+        self.pending.append((self.completed, fid, geometryKey(wkb), packPoints(points),
+                             struct.pack(f'<{len(counts)}q', *counts) if counts is not None else None,
+                             histogramBytes(histogram) if histogram is not None else None))
+        self.completed += 1
+        self.pointCount += len(points[0])
+        if len(self.pending) >= self.commitEvery or time.monotonic() - self.lastCommit >= self.commitSeconds:
+            self.commit()
+
+    def commit(self):
+        with self.connection:
+            if self.pending:
+                self.connection.executemany('INSERT INTO results VALUES (?, ?, ?, ?, ?, ?)', self.pending)
+            self.connection.execute("UPDATE meta SET value = ? WHERE key = 'points'", (str(self.pointCount),))
+        self.pending = []
+        self.lastCommit = time.monotonic()
+
+    def replay(self, records):
+        """
+        Yields (record, points, counts, histogram) for the first journaled
+        features of records, where record[0] is the fid and record[1] the
+        WKB of a feature, and returns the iterator of the rest. Raises
+        ValueError and clears the journal when the features are not read
+        in the journaled order any more, e.g. after the layer was edited.
+        """
+        records = iter(records)
+        rows = self.connection.execute('SELECT fid, key, points, counts, histogram FROM results ORDER BY seq')
+        for fid, key, points, counts, histogram in rows:
+            record = next(records, None)
+            if record is None or record[0] != fid or geometryKey(record[1]) != key:
+                rows.close()
+                self.reset()
+                raise ValueError(f'The checkpoint journal {self.path} does not match the layer any more, '
+                                 f'it was cleared, run the calculation again')
+            yield (record,
+                   unpackPoints(points),
+                   list(struct.unpack(f'<{len(counts) // 8}q', counts)) if counts is not None else None,
+                   histogramFromBytes(histogram) if histogram is not None else None)
+        return records
+
+    def resume(self, records, compute):
+        """
+        Yields the replayed results of the journaled features, then the
+        compute(rest of records) results, journaling them on the way.
+        """
+        records = yield from self.replay(records)
+        for record, points, counts, histogram in compute(records):
+            self.add(record[0], record[1], points, counts, histogram)
+            yield record, points, counts, histogram
+
+    def close(self, remove=False):
+        """
+        Commits the pending results, or removes the journal file of a
+        finished run with remove set.
+        """
+        if remove:
+            self.connection.close()
+            os.remove(self.path)
+            return
+        self.commit()
+        self.connection.close()
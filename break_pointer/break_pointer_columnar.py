@@ -0,0 +1,168 @@
+"""
+Columnar export of the break points and the per polygon metrics.
+
+With pyarrow the tables are written as GeoParquet in batches. Without it
+every column is appended to a raw little-endian binary file in a
+'<name>_columns' folder next to the requested path, described by a
+schema.json, a layout np.fromfile or np.memmap reads directly.
+"""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+__revision__ = '$Format:%H$'
+
+import os
+import sys
+import json
+import struct
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+POINT_COLUMNS = (('x', 'float64'), ('y', 'float64'), ('angle', 'float64'), ('angle1', 'float64'),
+                 ('angle2', 'float64'), ('fid', 'int64'))
+METRIC_COLUMNS = (('fid', 'int64'), ('count', 'int64'), ('perimeter', 'float64'), ('area', 'float64'),
+                  ('dens_perim', 'float64'), ('dens_area', 'float64'))
+TYPECODES = {'float64': 'd', 'int64': 'q'}
+WKB_POINT_SIZE = 21
+
+
+def pointWkb(xs, ys):
+    """
+    Returns the little-endian WKB points of the coordinates concatenated,
+    WKB_POINT_SIZE bytes each.
+    """
+    if np is not None:
+        points = np.empty(len(xs), dtype=[('order', 'u1'), ('type', '<u4'), ('x', '<f8'), ('y', '<f8')])
+        points['order'] = 1
+        points['type'] = 1
+        points['x'] = np.frombuffer(xs, dtype=np.float64) if isinstance(xs, array) else xs
+        points['y'] = np.frombuffer(ys, dtype=np.float64) if isinstance(ys, array) else ys
+        return points.tobytes()
+    return b''.join(struct.pack('<BIdd', 1, 1, x, y) for x, y in zip(xs, ys))
+
+
+class ColumnarWriter:
+    """
+    Buffers the rows of one table column by column in typed arrays and
+    writes them every batchSize rows. With geometry set a WKB point column
+    built from the x and y columns is added as the GeoParquet geometry.
+    outputPath is what is actually written, the GeoParquet file or the
+    folder of the raw columns.
+    """
+
+    def __init__(self, path, columns, batchSize=65536, geometry=False, crs=None):
+        self.path = path
+        self.columns = columns
+        self.batchSize = max(1, int(batchSize))
+        self.geometry = geometry
+        self.rows = 0
+        self.written = 0
+        self.buffers = self.emptyBuffers()
+        if pa is not None:
+            fields = [pa.field(name, getattr(pa, kind)()) for name, kind in columns]
+            metadata = None
+            if geometry:
+                fields.append(pa.field('geometry', pa.binary()))
+                metadata = {'geo': json.dumps({
+                    'version': '1.0.0',
+                    'primary_column': 'geometry',
+                    'columns': {'geometry': {'encoding': 'WKB', 'geometry_types': ['Point'], 'crs': crs}}
+                })}
+            self.schema = pa.schema(fields, metadata=metadata)
+            self.writer = pq.ParquetWriter(path, self.schema)
+            self.outputPath = path
+        else:
+            self.folder = os.path.splitext(path)[0] + '_columns'
+            os.makedirs(self.folder, exist_ok=True)
+            self.outputPath = self.folder
+            self.files = {name: open(os.path.join(self.folder, name + '.bin'), 'wb') for name, kind in columns}
+
+    def emptyBuffers(self):
+        return {name: array(TYPECODES[kind]) for name, kind in self.columns}
+
+    def append(self, **values):
+        """
+        Appends rows, every column given as a sequence of the same length.
+        """
+        for name, kind in self.columns:
+            self.buffers[name].extend(values[name])
+        self.rows = len(self.buffers[self.columns[0][0]])
+        if self.rows >= self.batchSize:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        if pa is not None:
+            arrays = [pa.Array.from_buffers(getattr(pa, kind)(), self.rows, [None, pa.py_buffer(self.buffers[name])])
+                      for name, kind in self.columns]
+            if self.geometry:
+                offsets = array('i', range(0, (self.rows + 1) * WKB_POINT_SIZE, WKB_POINT_SIZE))
+                data = pointWkb(self.buffers['x'], self.buffers['y'])
+                arrays.append(pa.Array.from_buffers(pa.binary(), self.rows,
+                                                    [None, pa.py_buffer(offsets), pa.py_buffer(data)]))
+            self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        else:
+            for name, kind in self.columns:
+                values = self.buffers[name]
+                if sys.byteorder != 'little':
+                    values.byteswap()
+                values.tofile(self.files[name])
+        self.written += self.rows
+        self.rows = 0
+        self.buffers = self.emptyBuffers()
+
+    def close(self):
+        self.flush()
+        if pa is not None:
+            self.writer.close()
+            return
+        for file in self.files.values():
+            file.close()
+        with open(os.path.join(self.folder, 'schema.json'), 'w', encoding='utf-8') as f:
+            json.dump({'rows': self.written,
+                       'columns': [{'name': name, 'type': kind, 'file': name + '.bin', 'byteorder': 'little'}
+                                   for name, kind in self.columns]}, f, indent=2)
+
+
+class ColumnarExport:
+    """
+    The break point table at path and the per polygon metric table next to
+    it with a '_metrics' suffix. pointsPath and metricsPath are the files or
+    column folders actually written.
+    """
+
+    def __init__(self, path, crs=None, batchSize=65536):
+        stem, extension = os.path.splitext(path)
+        self.points = ColumnarWriter(path, POINT_COLUMNS, batchSize, geometry=True, crs=crs)
+        self.metrics = ColumnarWriter(stem + '_metrics' + (extension or '.parquet'), METRIC_COLUMNS, batchSize)
+        self.pointsPath = self.points.outputPath
+        self.metricsPath = self.metrics.outputPath
+
+    def addPoints(self, fid, points):
+        """
+        Appends the featureBreakPoints result of a feature.
+        """
+        xs, ys, angles, angles1, angles2 = points
+        self.points.append(x=xs, y=ys, angle=angles, angle1=angles1, angle2=angles2, fid=[fid] * len(xs))
+
+    def addMetrics(self, fid, count, perimeter, area):
+        self.metrics.append(fid=(fid,), count=(count,), perimeter=(perimeter,), area=(area,),
+                            dens_perim=(count / perimeter if perimeter > 0 else float('nan'),),
+                            dens_area=(count / area if area > 0 else float('nan'),))
+
+    def close(self):
+        self.points.close()
+        self.metrics.close()
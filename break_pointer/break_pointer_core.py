@@ -0,0 +1,101 @@
+"""
+Headless entry point of the Break Point Index calculation.
+
+Everything the Processing algorithm computes per polygon is available here
+from plain coordinate arrays or WKB, without QGIS: import this module in a
+plain Python process to get the break points and the metrics. The
+algorithm is a QGIS wrapper around the same functions.
+
+    from break_pointer.break_pointer_core import analyzePolygon
+    result = analyzePolygon(xs, ys, ringOffsets=[0, 5, 10])
+    result.count, result.densPerim
+
+Only the provider, algorithm, batch and sink modules import QGIS. This
+module and every helper it builds on (engine, wkb, parallel,
+thinning and the other break_pointer_* modules) must stay free of it, since
+the spawned workers and the tests import them in a plain Python process.
+"""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+__revision__ = '$Format:%H$'
+
+from collections import namedtuple
+
+from .break_pointer_engine import (featureBreakPoints, featureResults, largestPart, polygonArea, polygonPerimeter,
+                                   histogramCounts, histogramBytes, histogramFromBytes)
+from .break_pointer_wkb import decodePolygons
+from .break_pointer_parallel import breakPointResults, CHUNK_SIZE
+
+# points holds the (x, y, angle, angle1, angle2) lists of the break points,
+# the densities are None for zero perimeters or areas
+PolygonResult = namedtuple('PolygonResult', 'points count area perimeter densPerim densArea')
+
+
+def splitParts(xs, ys, ringOffsets, partOffsets=None):
+    """
+    Returns the decoded polygon parts, (xs, ys, ringOffsets) tuples, of flat
+    coordinate arrays. ringOffsets holds the start of every ring in xs and
+    ys plus their length, partOffsets the start of every part in the rings
+    plus the ring count; without it all rings belong to one part.
+    """
+    ringOffsets = list(ringOffsets)
+    if partOffsets is None:
+        partOffsets = [0, len(ringOffsets) - 1]
+    parts = []
+    for part in range(len(partOffsets) - 1):
+        first, last = partOffsets[part], partOffsets[part + 1]
+        start, end = ringOffsets[first], ringOffsets[last]
+        parts.append((xs[start:end], ys[start:end], [offset - start for offset in ringOffsets[first:last + 1]]))
+    return parts
+
+
+def polygonResult(parts, points):
+    """
+    Returns the PolygonResult of decoded polygon parts and their
+    featureBreakPoints result.
+    """
+    count = len(points[0])
+    area = polygonArea(parts)
+    perimeter = polygonPerimeter(parts)
+    return PolygonResult(points, count, area, perimeter,
+                         count / perimeter if perimeter > 0 else None,
+                         count / area if area > 0 else None)
+
+
+def analyzeParts(parts, LowerT=20, UpperT=160, InnerRings=True):
+    """
+    Returns the PolygonResult of decoded polygon parts. Area and perimeter
+    cover every part and hole, like the QGIS geometry measures.
+    """
+    return polygonResult(parts, featureBreakPoints(parts, LowerT, UpperT, InnerRings))
+
+
+def analyzePolygon(xs, ys, ringOffsets=None, partOffsets=None, LowerT=20, UpperT=160, InnerRings=True):
+    """
+    Returns the PolygonResult of a polygon given as flat coordinate arrays,
+    see splitParts. Without ringOffsets xs and ys hold a single ring.
+    """
+    if ringOffsets is None:
+        ringOffsets = [0, len(xs)]
+    return analyzeParts(splitParts(xs, ys, ringOffsets, partOffsets), LowerT, UpperT, InnerRings)
+
+
+def analyzeWkb(wkb, LowerT=20, UpperT=160, InnerRings=True):
+    """
+    Returns the PolygonResult of a WKB or EWKB Polygon or MultiPolygon.
+    """
+    return analyzeParts(decodePolygons(wkb), LowerT, UpperT, InnerRings)
+
+
+def analyzeWkbs(wkbs, LowerT=20, UpperT=160, InnerRings=True, workers=1, chunkSize=CHUNK_SIZE):
+    """
+    Yields the PolygonResult of every WKB in order, computed by workers
+    processes (0 means one per CPU core) like in the Processing algorithm.
+    """
+    records = ((None, wkb) for wkb in wkbs)
+    for record, points, counts, histogram in breakPointResults(records, LowerT, UpperT, InnerRings,
+                                                               workers=workers, chunkSize=chunkSize):
+        yield polygonResult(decodePolygons(record[1]), points)
@@ -0,0 +1,39 @@
+"""
+Choice of a local projected working CRS for geographic layers.
+
+A layer narrow enough gets the WGS 84 UTM zone of its centre, wider or
+polar layers a Lambert azimuthal equal-area projection centred on them, so
+the angles, lengths and areas are measured in metres.
+"""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+__revision__ = '$Format:%H$'
+
+import math
+
+# Widest extent (degrees of longitude) still measured in a single UTM zone
+UTM_MAX_WIDTH = 6.0
+UTM_MIN_LATITUDE = -80.0
+UTM_MAX_LATITUDE = 84.0
+
+
+def utmZone(lon):
+    """
+    Returns the number (1-60) of the UTM zone of a longitude.
+    """
+    return min(int(math.floor(((lon + 180.0) % 360.0) / 6.0)) + 1, 60)
+
+
+def localCrsDefinition(xmin, ymin, xmax, ymax):
+    """
+    Returns the EPSG code of the UTM zone or the PROJ string of the
+    equal-area projection to measure a lon/lat extent in.
+    """
+    lon = (xmin + xmax) / 2
+    lat = (ymin + ymax) / 2
+    if xmax - xmin <= UTM_MAX_WIDTH and UTM_MIN_LATITUDE <= ymin and ymax <= UTM_MAX_LATITUDE:
+        return f"EPSG:{(32600 if lat >= 0 else 32700) + utmZone(lon)}"
+    return f"+proj=laea +lat_0={lat:.6f} +lon_0={lon:.6f} +x_0=0 +y_0=0 +datum=WGS84 +units=m +no_defs"
@@ -0,0 +1,439 @@
+"""
+Array based vertex angle engine of the Break Point Index.
+
+A polygon part is handled as two flat coordinate sequences (xs, ys) holding
+the vertices of its rings one after the other, the same vertex order the
+algorithm always used.
+"""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+__revision__ = '$Format:%H$'
+
+import math
+import struct
+from bisect import bisect_left, bisect_right
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+RAD_TO_DEG = 180.0 / math.pi
+# Tolerance of QgsPointXY equality, used for the closing vertex check
+POINT_EPSILON = 1E-8
+# numpy's SIMD arctan2 can differ from libm atan2 in the last bits, so the
+# vertices this close to a threshold are classified again with math.atan2
+THRESHOLD_BAND = 1E-9
+# Below this many vertices per chunk the fixed cost of the numpy calls
+# outweighs the per vertex Python loop
+SMALL_CHUNK_VERTICES = 512
+
+
+def _near(a, b):
+    diff = a - b
+    return -POINT_EPSILON < diff <= POINT_EPSILON
+
+
+def trimPart(xs, ys):
+    """
+    Drops the closing vertex of a part if it equals the first one.
+    Returns (None, None) for parts with less than three vertices.
+    """
+    if len(xs) < 3:
+        return None, None
+    if _near(xs[0], xs[-1]) and _near(ys[0], ys[-1]):
+        return xs[:-1], ys[:-1]
+    return xs, ys
+
+
+def exactAngles(xs, ys, index):
+    """
+    Returns the angle, angle1 and angle2 values of the vertices in index.
+    angle1 and angle2 are the bearings from the vertex towards the previous
+    and the next vertex of the trimmed part, angle is the deviation from a
+    straight line, computed with math.atan2 and math.degrees.
+    """
+    n = len(xs)
+    if np is None:
+        return _exactAnglesPython(xs, ys, index)
+
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    index = np.asarray(index, dtype=np.intp)
+    count = len(index)
+    bx, by = xs[index], ys[index]
+    previous = index - 1
+    following = (index + 1) % n
+    # map() keeps the libm atan2 that math.atan2 uses
+    angles1 = np.fromiter(map(math.atan2, (ys[previous] - by).tolist(), (xs[previous] - bx).tolist()),
+                          dtype=np.float64, count=count) * RAD_TO_DEG
+    angles2 = np.fromiter(map(math.atan2, (ys[following] - by).tolist(), (xs[following] - bx).tolist()),
+                          dtype=np.float64, count=count) * RAD_TO_DEG
+    angles = np.abs(np.abs(angles2 - angles1) - 180)
+    return angles, angles1, angles2
+
+
+def _exactAnglesPython(xs, ys, index):
+    n = len(xs)
+    angles, angles1, angles2 = [], [], []
+    for i in index:
+        bx, by = xs[i], ys[i]
+        c = (i + 1) % n
+        ang1 = math.degrees(math.atan2(ys[i - 1] - by, xs[i - 1] - bx))
+        ang2 = math.degrees(math.atan2(ys[c] - by, xs[c] - bx))
+        angles.append(abs(abs(ang2 - ang1) - 180))
+        angles1.append(ang1)
+        angles2.append(ang2)
+    return angles, angles1, angles2
+
+
+def ringArea(xs, ys):
+    """
+    Returns the unsigned shoelace area of a ring, closed or not.
+    """
+    if len(xs) < 3:
+        return 0.0
+    if np is None:
+        x0, y0 = xs[0], ys[0]
+        n = len(xs)
+        twice = 0.0
+        for i in range(n):
+            j = (i + 1) % n
+            twice += (xs[i] - x0) * (ys[j] - y0) - (xs[j] - x0) * (ys[i] - y0)
+        return abs(twice) / 2
+
+    # Shifting to the first vertex keeps the precision of projected coordinates
+    xs = np.asarray(xs, dtype=np.float64) - xs[0]
+    ys = np.asarray(ys, dtype=np.float64) - ys[0]
+    return abs(float(np.dot(xs, np.roll(ys, -1)) - np.dot(np.roll(xs, -1), ys))) / 2
+
+
+def partArea(xs, ys, ringOffsets):
+    """
+    Returns the area of a polygon part, the outer ring minus the holes.
+    """
+    area = 0.0
+    for ring in range(len(ringOffsets) - 1):
+        start, end = ringOffsets[ring], ringOffsets[ring + 1]
+        ring_area = ringArea(xs[start:end], ys[start:end])
+        area += ring_area if ring == 0 else -ring_area
+    return area
+
+
+def ringLength(xs, ys):
+    """
+    Returns the length of a ring, closed or not.
+    """
+    if len(xs) < 2:
+        return 0.0
+    if np is None:
+        n = len(xs)
+        return math.fsum(math.hypot(xs[(i + 1) % n] - xs[i], ys[(i + 1) % n] - ys[i]) for i in range(n))
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    return float(np.hypot(np.diff(xs, append=xs[0]), np.diff(ys, append=ys[0])).sum())
+
+
+def polygonArea(parts):
+    """
+    Returns the area of a decoded polygon, holes subtracted.
+    """
+    return sum(partArea(xs, ys, ringOffsets) for xs, ys, ringOffsets in parts)
+
+
+def polygonPerimeter(parts):
+    """
+    Returns the length of every ring of a decoded polygon, holes included,
+    the same as QgsGeometry.length() of a polygon.
+    """
+    perimeter = 0.0
+    for xs, ys, ringOffsets in parts:
+        for ring in range(len(ringOffsets) - 1):
+            start, end = ringOffsets[ring], ringOffsets[ring + 1]
+            perimeter += ringLength(xs[start:end], ys[start:end])
+    return perimeter
+
+
+def largestPart(parts):
+    """
+    Returns a list holding only the largest part (the first one on ties),
+    the part the calculation keeps when InnerRings is off.
+    """
+    max_area = 0
+    max_index = 0
+    for i, (xs, ys, ringOffsets) in enumerate(parts):
+        area = partArea(xs, ys, ringOffsets)
+        if area > max_area:
+            max_area = area
+            max_index = i
+    return [parts[max_index]]
+
+
+def featureBreakPoints(parts, LowerT, UpperT, InnerRings):
+    """
+    Returns the break points of a decoded polygon as (x, y, angle, angle1,
+    angle2) lists of floats, in vertex order.
+    """
+    return featureResults(parts, LowerT, UpperT, InnerRings)[0]
+
+
+def featureAngles(parts, InnerRings):
+    """
+    Returns the (x, y, angle, angle1, angle2) arrays of every vertex of a
+    decoded polygon with exact angle values, the threshold independent
+    part of featureBreakPoints.
+    """
+    result = ([], [], [], [], [])
+    if not InnerRings and parts:
+        parts = largestPart(parts)
+    for xs, ys, ringOffsets in parts:
+        xs, ys = trimPart(xs, ys)
+        if xs is None:
+            continue
+        angles, angles1, angles2 = exactAngles(xs, ys, range(len(xs)))
+        for values, column in zip((xs, ys, angles, angles1, angles2), result):
+            column.append(values)
+    if np is not None:
+        return tuple(np.concatenate(column) if column else np.empty(0) for column in result)
+    return tuple([value for values in column for value in values] for column in result)
+
+
+def filterAngles(angles, LowerT, UpperT):
+    """
+    Returns the featureBreakPoints result from the featureAngles arrays of a
+    polygon, only applying the thresholds.
+    """
+    xs, ys, angles, angles1, angles2 = angles
+    if np is not None:
+        angles = np.asarray(angles, dtype=np.float64)
+        keep = (angles >= LowerT) & (angles <= UpperT)
+        return tuple(np.asarray(column, dtype=np.float64)[keep].tolist()
+                     for column in (xs, ys, angles, angles1, angles2))
+    index = [i for i, angle in enumerate(angles) if LowerT <= angle <= UpperT]
+    return tuple([column[i] for i in index] for column in (xs, ys, angles, angles1, angles2))
+
+
+def thresholdCounts(angles, thresholdPairs):
+    """
+    Returns the number of angles with lower <= angle <= upper for every
+    (lower, upper) pair, from one sort of the angles.
+    """
+    if np is not None:
+        angles = np.sort(np.asarray(angles, dtype=np.float64))
+        pairs = np.asarray(thresholdPairs, dtype=np.float64).reshape(-1, 2)
+        counts = np.searchsorted(angles, pairs[:, 1], 'right') - np.searchsorted(angles, pairs[:, 0], 'left')
+        return np.maximum(counts, 0).tolist()
+    angles = sorted(angles)
+    return [max(bisect_right(angles, upper) - bisect_left(angles, lower), 0) for lower, upper in thresholdPairs]
+
+
+def featureResults(parts, LowerT, UpperT, InnerRings, thresholdPairs=None, histogramBins=0):
+    """
+    Returns the featureBreakPoints result, the break point count of every
+    thresholdPairs pair (or None) and the angleHistogram with
+    histogramBins bins (or None) of a decoded polygon, see chunkResults.
+    """
+    return chunkResults([parts], LowerT, UpperT, InnerRings, thresholdPairs, histogramBins)[0]
+
+
+def chunkResults(partsList, LowerT, UpperT, InnerRings, thresholdPairs=None, histogramBins=0,
+                 smallChunk=None):
+    """
+    Returns the featureResults of every decoded polygon of partsList. The
+    trimmed parts of the whole chunk are evaluated as one coordinate array
+    with the previous and next vertex of every vertex indexed, so numpy is
+    called a fixed number of times per chunk, not per part. The angles are
+    classified once against the main thresholds, the sweep pairs and the
+    histogram edges together, and exact around all of them. Chunks with
+    fewer than smallChunk vertices, SMALL_CHUNK_VERTICES by default, are
+    computed in pure Python, faster there.
+    """
+    edges = histogramEdges(histogramBins) if histogramBins else []
+    features = []
+    for parts in partsList:
+        if not InnerRings and parts:
+            parts = largestPart(parts)
+        sequences = []
+        for xs, ys, ringOffsets in parts:
+            xs, ys = trimPart(xs, ys)
+            if xs is not None:
+                sequences.append((xs, ys))
+        features.append(sequences)
+    total = sum(len(xs) for sequences in features for xs, ys in sequences)
+    if np is None or total < (SMALL_CHUNK_VERTICES if smallChunk is None else smallChunk):
+        return [_featureResultsPython(sequences, LowerT, UpperT, thresholdPairs, histogramBins, edges)
+                for sequences in features]
+
+    lengths = np.array([len(xs) for sequences in features for xs, ys in sequences], dtype=np.intp)
+    featureSizes = np.array([sum(len(xs) for xs, ys in sequences) for sequences in features], dtype=np.intp)
+    featureEnds = np.cumsum(featureSizes)
+    featureStarts = featureEnds - featureSizes
+    if total:
+        xs = np.concatenate([np.asarray(xs, dtype=np.float64) for sequences in features for xs, ys in sequences])
+        ys = np.concatenate([np.asarray(ys, dtype=np.float64) for sequences in features for xs, ys in sequences])
+    else:
+        xs = ys = np.empty(0)
+    # The previous and the next vertex of every vertex, wrapping around each sequence
+    sequenceEnds = np.cumsum(lengths)
+    previous = np.arange(-1, total - 1)
+    previous[sequenceEnds - lengths] = sequenceEnds - 1
+    following = np.arange(1, total + 1)
+    following[sequenceEnds - 1] = sequenceEnds - lengths
+    dxp, dyp = xs[previous] - xs, ys[previous] - ys
+    dxn, dyn = xs[following] - xs, ys[following] - ys
+    angles = np.abs(np.abs(np.arctan2(dyn, dxn) - np.arctan2(dyp, dxp)) * RAD_TO_DEG - 180)
+
+    # numpy's arctan2 may differ in the last bits, the angles near a threshold are made exact
+    thresholds = [LowerT, UpperT] + [value for pair in thresholdPairs or () for value in pair] + edges
+    values = np.unique(np.asarray(thresholds, dtype=np.float64))
+    right = np.minimum(np.searchsorted(values, angles), len(values) - 1)
+    distance = np.minimum(np.abs(angles - values[np.maximum(right - 1, 0)]), np.abs(angles - values[right]))
+    close = np.flatnonzero(distance <= THRESHOLD_BAND)
+    if len(close):
+        angles[close] = _exactDifferences(dxp[close], dyp[close], dxn[close], dyn[close])[0]
+
+    index = np.flatnonzero((angles >= LowerT) & (angles <= UpperT))
+    columns = (xs[index].tolist(), ys[index].tolist()) + tuple(
+        values.tolist() for values in _exactDifferences(dxp[index], dyp[index], dxn[index], dyn[index]))
+    bounds = np.searchsorted(index, featureEnds).tolist()
+
+    counts = histograms = None
+    if thresholdPairs:
+        # One sort per feature, the pairs are counted with binary searches like thresholdCounts
+        pairs = np.asarray(thresholdPairs, dtype=np.float64).reshape(-1, 2)
+        counts = []
+        for start, end in zip(featureStarts.tolist(), featureEnds.tolist()):
+            ordered = np.sort(angles[start:end])
+            inside = np.searchsorted(ordered, pairs[:, 1], 'right') - np.searchsorted(ordered, pairs[:, 0], 'left')
+            counts.append(np.maximum(inside, 0).tolist())
+    if histogramBins:
+        width = 2 * histogramBins + 1
+        edgeArray = np.asarray(edges)
+        slot = np.minimum(np.searchsorted(edgeArray, angles), histogramBins)
+        slot = np.clip(2 * slot - (edgeArray[slot] != angles), 0, 2 * histogramBins)
+        featureIds = np.repeat(np.arange(len(features)), featureSizes)
+        histograms = np.bincount(featureIds * width + slot,
+                                 minlength=len(features) * width).reshape(len(features), width).tolist()
+
+    results = []
+    start = 0
+    for k, end in enumerate(bounds):
+        results.append((tuple(column[start:end] for column in columns),
+                        counts[k] if counts is not None else None,
+                        histograms[k] if histograms is not None else None))
+        start = end
+    return results
+
+
+def _exactDifferences(dxp, dyp, dxn, dyn):
+    """
+    Returns the exact angle, angle1 and angle2 arrays from the coordinate
+    differences towards the previous and the next vertices, like
+    exactAngles.
+    """
+    # map() keeps the libm atan2 that math.atan2 uses
+    angles1 = np.fromiter(map(math.atan2, dyp.tolist(), dxp.tolist()), dtype=np.float64, count=len(dxp)) * RAD_TO_DEG
+    angles2 = np.fromiter(map(math.atan2, dyn.tolist(), dxn.tolist()), dtype=np.float64, count=len(dxn)) * RAD_TO_DEG
+    return np.abs(np.abs(angles2 - angles1) - 180), angles1, angles2
+
+
+def _featureResultsPython(sequences, LowerT, UpperT, thresholdPairs, histogramBins, edges):
+    result = ([], [], [], [], [])
+    classified = []
+    for xs, ys in sequences:
+        if np is not None:
+            xs, ys = np.asarray(xs, dtype=np.float64).tolist(), np.asarray(ys, dtype=np.float64).tolist()
+        angles, angles1, angles2 = _exactAnglesPython(xs, ys, range(len(xs)))
+        classified.extend(angles)
+        for i, angle in enumerate(angles):
+            if LowerT <= angle <= UpperT:
+                for column, value in zip(result, (xs[i], ys[i], angle, angles1[i], angles2[i])):
+                    column.append(value)
+    counts = histogram = None
+    if thresholdPairs:
+        classified.sort()
+        counts = [max(bisect_right(classified, upper) - bisect_left(classified, lower), 0)
+                  for lower, upper in thresholdPairs]
+    if histogramBins:
+        histogram = [0] * (2 * histogramBins + 1)
+        for angle in classified:
+            index = min(bisect_left(edges, angle), histogramBins)
+            histogram[min(max(2 * index - (edges[index] != angle), 0), 2 * histogramBins)] += 1
+    return result, counts, histogram
+
+
+def histogramEdges(bins):
+    """
+    Returns the bins + 1 bin edges splitting the 0-180° angle range evenly.
+    """
+    return [k * 180.0 / bins for k in range(bins + 1)]
+
+
+def angleHistogram(angles, bins):
+    """
+    Returns the angle histogram of a polygon as 2 * bins + 1 counts. The
+    even slots count the angles equal to a bin edge, the odd slots the ones
+    strictly between two edges, so a threshold pair lying on edges is
+    answered exactly by histogramCounts. The angles have to be exact around
+    the edges.
+    """
+    edges = histogramEdges(bins)
+    if np is not None:
+        angles = np.asarray(angles, dtype=np.float64)
+        edgeArray = np.asarray(edges)
+        index = np.minimum(np.searchsorted(edgeArray, angles), bins)
+        slots = 2 * index - (edgeArray[index] != angles)
+        return np.bincount(np.clip(slots, 0, 2 * bins), minlength=2 * bins + 1).tolist()
+    histogram = [0] * (2 * bins + 1)
+    for angle in angles:
+        index = min(bisect_left(edges, angle), bins)
+        slot = 2 * index - (edges[index] != angle)
+        histogram[min(max(slot, 0), 2 * bins)] += 1
+    return histogram
+
+
+def histogramSlot(edges, threshold, upper):
+    """
+    Returns the histogram slot holding threshold, the edge slot if it lies
+    on a bin edge, otherwise the whole bin around it.
+    """
+    index = min(bisect_left(edges, threshold), len(edges) - 1)
+    if edges[index] == threshold:
+        return 2 * index
+    if threshold > edges[index]:
+        return 2 * index if upper else 2 * index + 1
+    return 2 * index - 1 if upper else max(2 * index - 1, 0)
+
+
+def histogramCounts(histogram, thresholdPairs):
+    """
+    Returns the number of angles with lower <= angle <= upper for every
+    (lower, upper) pair from a histogram, with one prefix sum. Exact for
+    thresholds on bin edges, otherwise the bins holding the thresholds are
+    counted in full.
+    """
+    bins = (len(histogram) - 1) // 2
+    edges = histogramEdges(bins)
+    prefix = [0]
+    for count in histogram:
+        prefix.append(prefix[-1] + count)
+    counts = []
+    for lower, upper in thresholdPairs:
+        first = histogramSlot(edges, lower, False)
+        last = histogramSlot(edges, upper, True)
+        counts.append(max(prefix[last + 1] - prefix[first], 0))
+    return counts
+
+
+def histogramBytes(histogram):
+    """
+    Returns the histogram as little-endian unsigned 32 bit integers.
+    """
+    return struct.pack(f'<{len(histogram)}I', *histogram)
+
+
+def histogramFromBytes(data):
+    return list(struct.unpack(f'<{len(data) // 4}I', data))
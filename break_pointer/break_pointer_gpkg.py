@@ -0,0 +1,150 @@
+"""
+Direct GeoPackage reader of polygon layers.
+
+The feature table is read with sqlite3 in large batches, and the WKB is cut
+out of the GeoPackage binary geometry header without any provider in
+between. Only plain polygon tables qualify, others are left to the QGIS
+provider.
+"""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+__revision__ = '$Format:%H$'
+
+import os
+import sqlite3
+from urllib.request import pathname2url
+
+# Envelope size in bytes by the envelope indicator bits of the header flags
+ENVELOPE_SIZES = {0: 0, 1: 32, 2: 48, 3: 48, 4: 64}
+POLYGON_TYPES = ('POLYGON', 'MULTIPOLYGON')
+
+
+def gpkgWkb(blob):
+    """
+    Returns the WKB of a GeoPackage binary geometry, b'' for NULL and
+    empty geometries. Raises ValueError for blobs that are not GeoPackage
+    geometries.
+    """
+    if blob is None:
+        return b''
+    if len(blob) < 8 or blob[0:2] != b'GP':
+        raise ValueError('Not a GeoPackage geometry blob')
+    flags = blob[3]
+    if flags & 0x20:
+        raise ValueError('Extended GeoPackage geometry types are not supported')
+    if flags & 0x10:
+        return b''
+    envelope = ENVELOPE_SIZES.get((flags >> 1) & 0x07)
+    if envelope is None:
+        raise ValueError('Invalid GeoPackage envelope indicator')
+    return bytes(blob[8 + envelope:])
+
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class GeoPackageReader:
+    """
+    Read-only access to a polygon feature table of a GeoPackage. Without a
+    table name the file has to hold a single feature table. Raises
+    ValueError when the table cannot be read this way.
+    """
+
+    def __init__(self, path, table=None):
+        self.path = path
+        uri = 'file:' + pathname2url(os.path.abspath(path)) + '?mode=ro'
+        self.connection = sqlite3.connect(uri, uri=True)
+        try:
+            self.table, self.geometryColumn = self.geometryTable(table)
+            self.fidColumn = self.primaryKey()
+        except (ValueError, sqlite3.Error):
+            self.connection.close()
+            raise
+
+    def geometryTable(self, table):
+        query = 'SELECT table_name, column_name, geometry_type_name FROM gpkg_geometry_columns'
+        rows = [row for row in self.connection.execute(query) if table is None or row[0].lower() == table.lower()]
+        if len(rows) != 1:
+            raise ValueError(f'No single geometry table {table or ""} in {self.path}')
+        name, column, geometryType = rows[0]
+        if geometryType.upper() not in POLYGON_TYPES:
+            raise ValueError(f'The geometry type of {name} is {geometryType}, not a polygon type')
+        return name, column
+
+    def primaryKey(self):
+        keys = [row[1] for row in self.connection.execute(f'PRAGMA table_info({quote(self.table)})') if row[5]]
+        if len(keys) != 1:
+            raise ValueError(f'{self.table} has no single integer primary key')
+        return keys[0]
+
+    def columns(self):
+        return [row[1] for row in self.connection.execute(f'PRAGMA table_info({quote(self.table)})')]
+
+    def records(self, attributes=(), batchSize=10000):
+        """
+        Yields (fid, wkb, *attribute values) for every row in fid order,
+        fetching batchSize rows at a time.
+        """
+        names = [self.fidColumn, self.geometryColumn] + list(attributes)
+        cursor = self.connection.execute(f'SELECT {", ".join(quote(name) for name in names)} '
+                                         f'FROM {quote(self.table)} ORDER BY {quote(self.fidColumn)}')
+        while True:
+            rows = cursor.fetchmany(batchSize)
+            if not rows:
+                break
+            for fid, blob, *values in rows:
+                yield (fid, gpkgWkb(blob), *values)
+
+    def spatialIndex(self):
+        """
+        Returns the name of the R*Tree spatial index table of the geometry
+        column, None if the GeoPackage has none.
+        """
+        name = f'rtree_{self.table}_{self.geometryColumn}'
+        row = self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                      (name,)).fetchone()
+        return row[0] if row else None
+
+    def rectRecords(self, rect, attributes=(), batchSize=10000):
+        """
+        Yields (fid, wkb, bounds, *attribute values) for the rows whose
+        bounding box in the spatial index intersects rect, in fid order.
+        bounds is the (minx, miny, maxx, maxy) of the index entry. Rows
+        without geometry are not in the index.
+        """
+        names = ', '.join(f't.{quote(name)}' for name in [self.fidColumn, self.geometryColumn] + list(attributes))
+        cursor = self.connection.execute(
+            f'SELECT {names}, r.minx, r.miny, r.maxx, r.maxy FROM {quote(self.spatialIndex())} r '
+            f'JOIN {quote(self.table)} t ON t.{quote(self.fidColumn)} = r.id '
+            f'WHERE r.maxx >= ? AND r.minx <= ? AND r.maxy >= ? AND r.miny <= ? ORDER BY r.id',
+            (rect[0], rect[2], rect[1], rect[3]))
+        while True:
+            rows = cursor.fetchmany(batchSize)
+            if not rows:
+                break
+            for fid, blob, *values in rows:
+                yield (fid, gpkgWkb(blob), tuple(values[-4:]), *values[:-4])
+
+    def unindexedRecords(self, attributes=(), batchSize=10000):
+        """
+        Yields (fid, wkb, *attribute values) for the rows missing from the
+        spatial index, the ones with NULL or empty geometry, in fid order.
+        """
+        names = ', '.join(quote(name) for name in [self.fidColumn, self.geometryColumn] + list(attributes))
+        cursor = self.connection.execute(
+            f'SELECT {names} FROM {quote(self.table)} '
+            f'WHERE {quote(self.fidColumn)} NOT IN (SELECT id FROM {quote(self.spatialIndex())}) '
+            f'ORDER BY {quote(self.fidColumn)}')
+        while True:
+            rows = cursor.fetchmany(batchSize)
+            if not rows:
+                break
+            for fid, blob, *values in rows:
+                yield (fid, gpkgWkb(blob), *values)
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,182 @@
+"""
+Process pool evaluation of the break points of whole features.
+
+The features are sent to the workers as WKB in chunks, and the results come
+back in the order the features were read.
+"""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+__revision__ = '$Format:%H$'
+
+import os
+import sys
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .break_pointer_engine import chunkResults, featureAngles, filterAngles, thresholdCounts, angleHistogram
+from .break_pointer_wkb import decodePolygons
+
+CHUNK_SIZE = 256
+
+
+def processChunk(chunk, LowerT, UpperT, InnerRings, anglesOnly=False, thresholdPairs=None, histogramBins=0):
+    """
+    Returns the featureResults (break points, sweep counts or None,
+    histogram or None) of every WKB in chunk, or the featureAngles results
+    with anglesOnly set.
+    """
+    if anglesOnly:
+        return [featureAngles(decodePolygons(wkb), InnerRings) for wkb in chunk]
+    return chunkResults([decodePolygons(wkb) for wkb in chunk], LowerT, UpperT, InnerRings, thresholdPairs,
+                        histogramBins)
+
+
+def pythonExecutable():
+    """
+    Returns the Python interpreter to start the workers with. Inside QGIS
+    sys.executable is the QGIS binary itself, so the interpreter next to it
+    is looked up. Returns None if there is none.
+    """
+    if os.path.basename(sys.executable).lower().startswith('python'):
+        return sys.executable
+    names = ('python.exe', 'python3.exe') if os.name == 'nt' else ('python3', 'python')
+    for folder in (sys.exec_prefix, os.path.join(sys.exec_prefix, 'bin'), os.path.dirname(sys.executable)):
+        for name in names:
+            path = os.path.join(folder, name)
+            if os.path.isfile(path):
+                return path
+    return None
+
+
+def createExecutor(workers):
+    """
+    Returns a spawn based process pool, forking a running QGIS is not safe.
+    """
+    executable = pythonExecutable()
+    if executable is None:
+        raise OSError('No Python interpreter found to start the worker processes')
+    context = multiprocessing.get_context('spawn')
+    if executable != sys.executable:
+        context.set_executable(executable)
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+
+def chunks(records, chunkSize):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunkSize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def breakPointResults(records, LowerT, UpperT, InnerRings, workers=1, chunkSize=CHUNK_SIZE, onFallback=None,
+                      cache=None, thresholdPairs=None, histogramBins=0, executor=None):
+    """
+    Yields (record, points, counts, histogram) in the order of records,
+    where record[1] is the WKB of a feature, points its featureBreakPoints
+    result, counts its break point count for every pair of thresholdPairs
+    and histogram its angleHistogram with histogramBins bins, the last two
+    None when not requested. The other record values stay in this process.
+
+    With more than one worker (0 means one per CPU core) the chunks are
+    computed in a process pool, with at most two chunks per worker in
+    flight. When the pool cannot be started or breaks down, onFallback is
+    called with the reason and the remaining chunks are computed serially.
+
+    With an AngleCache only the features missing from it are computed, as
+    featureAngles, and every result is filtered from the cached angles.
+
+    A shared executor, created by the caller with createExecutor, is used
+    instead of a new pool and is left running, so several layers can be
+    computed by the same workers.
+    """
+    anglesOnly = cache is not None
+
+    def prepare(chunk):
+        """
+        Returns the cache state of the chunk and the WKBs to compute.
+        """
+        if cache is None:
+            return None, [record[1] for record in chunk]
+        keys = [cache.key(record[1], InnerRings) for record in chunk]
+        cached = [cache.get(key) for key in keys]
+        return (keys, cached), [record[1] for record, angles in zip(chunk, cached) if angles is None]
+
+    def merge(chunk, state, computed):
+        if state is None:
+            return [(record, *result) for record, result in zip(chunk, computed)]
+        computed = iter(computed)
+        results = []
+        for record, key, angles in zip(chunk, *state):
+            if angles is None:
+                angles = next(computed)
+                cache.put(key, angles)
+            counts = thresholdCounts(angles[2], thresholdPairs) if thresholdPairs else None
+            histogram = angleHistogram(angles[2], histogramBins) if histogramBins else None
+            results.append((record, filterAngles(angles, LowerT, UpperT), counts, histogram))
+        return results
+
+    def serial(chunk, state, wkbs):
+        return merge(chunk, state, processChunk(wkbs, LowerT, UpperT, InnerRings, anglesOnly, thresholdPairs,
+                                                histogramBins))
+
+    workers = workers or os.cpu_count() or 1
+    shared = executor is not None
+    if not shared and workers > 1:
+        try:
+            executor = createExecutor(workers)
+        except (OSError, ValueError, ImportError, NotImplementedError) as e:
+            if onFallback:
+                onFallback(f'Parallel mode is not available, running serially: {e}')
+
+    if executor is None:
+        for chunk in chunks(records, chunkSize):
+            yield from serial(chunk, *prepare(chunk))
+        return
+
+    pending = deque()
+    broken = False
+
+    def collect(chunk, state, wkbs, future):
+        nonlocal broken
+        if future is not None and not broken:
+            try:
+                return merge(chunk, state, future.result())
+            except BrokenProcessPool as e:
+                broken = True
+                if onFallback:
+                    onFallback(f'Worker processes stopped, running the rest serially: {e}')
+        return serial(chunk, state, wkbs)
+
+    try:
+        for chunk in chunks(records, chunkSize):
+            state, wkbs = prepare(chunk)
+            future = None
+            if wkbs and not broken:
+                try:
+                    future = executor.submit(processChunk, wkbs, LowerT, UpperT, InnerRings, anglesOnly,
+                                             thresholdPairs, histogramBins)
+                except (BrokenProcessPool, OSError, RuntimeError) as e:
+                    broken = True
+                    if onFallback:
+                        onFallback(f'Worker processes could not be started, running serially: {e}')
+            pending.append((chunk, state, wkbs, future))
+            while len(pending) > workers * 2:
+                yield from collect(*pending.popleft())
+        while pending:
+            yield from collect(*pending.popleft())
+    finally:
+        if shared:
+            for chunk, state, wkbs, future in pending:
+                if future is not None:
+                    future.cancel()
+        else:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,114 @@
+"""
+Stage timings and throughput figures of a calculation run.
+
+The stages of processAlgorithm are timed as laps one after the other, the
+interleaved parts of the feature loop by timing the iterators and blocks
+they consist of. Peak memory is traced with tracemalloc on request, since
+tracing slows every allocation down.
+"""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+__revision__ = '$Format:%H$'
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class StageProfile:
+    """
+    Wall time per stage in seconds, in the order the stages first ran,
+    and counters like the number of features, vertices and break points.
+    """
+
+    def __init__(self, traceMemory=False):
+        self.stages = {}
+        self.counters = {}
+        self.ownTrace = traceMemory and not tracemalloc.is_tracing()
+        if self.ownTrace:
+            tracemalloc.start()
+        self.traceMemory = traceMemory
+        self.started = self.lapStart = time.perf_counter()
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def lap(self, name):
+        """
+        Records the time since the previous lap, or the start, as name.
+        """
+        now = time.perf_counter()
+        self.add(name, now - self.lapStart)
+        self.lapStart = now
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def timed(self, iterable, name):
+        """
+        Yields the items of iterable, adding the time spent producing them
+        to the stage name.
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(name, time.perf_counter() - start)
+                return
+            self.add(name, time.perf_counter() - start)
+            yield item
+
+    def rate(self, counter, stage):
+        seconds = self.stages.get(stage)
+        return self.counters.get(counter, 0) / seconds if seconds else None
+
+    def report(self):
+        """
+        Returns the stages, counters, throughput rates and the peak traced
+        memory in bytes (None without tracing) as a dict.
+        """
+        return {
+            'total': time.perf_counter() - self.started,
+            'stages': dict(self.stages),
+            'counters': dict(self.counters),
+            'rates': {
+                'featuresPerSecond': self.rate('features', 'calculateBPI'),
+                'verticesPerSecond': self.rate('vertices', 'breakPoints'),
+                'breakPointsPerSecond': self.rate('breakPoints', 'pointSink'),
+            },
+            'peakMemory': tracemalloc.get_traced_memory()[1] if self.traceMemory and tracemalloc.is_tracing() else None,
+        }
+
+    def lines(self):
+        """
+        Returns the report as readable lines for the feedback.
+        """
+        report = self.report()
+        lines = [f"{name}: {seconds:.3f} s" for name, seconds in report['stages'].items()]
+        lines += [f"{name}: {value:,.0f}" for name, value in report['rates'].items() if value is not None]
+        if report['peakMemory'] is not None:
+            lines.append(f"peak traced memory: {report['peakMemory'] / 1024 / 1024:.1f} MB")
+        return lines
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def close(self):
+        if self.ownTrace:
+            tracemalloc.stop()
+            self.ownTrace = False
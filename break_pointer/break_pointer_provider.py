@@ -34,6 +34,7 @@ import os, inspect
 from qgis.PyQt.QtGui import QIcon
 from qgis.core import QgsProcessingProvider
 from .break_pointer_algorithm import BreakPointIndexAlgorithm
+from .break_pointer_batch import BreakPointIndexBatchAlgorithm
 
 
 class BreakPointIndexProvider(QgsProcessingProvider):
@@ -56,6 +57,7 @@ class BreakPointIndexProvider(QgsProcessingProvider):
         Loads all algorithms belonging to this provider.
         """
         self.addAlgorithm(BreakPointIndexAlgorithm())
+        self.addAlgorithm(BreakPointIndexBatchAlgorithm())
 
 
     def id(self):
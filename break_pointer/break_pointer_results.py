@@ -0,0 +1,151 @@
+"""
+Compact column store of the per polygon results of the calculation.
+
+The results are kept in parallel typed arrays instead of a dict per
+feature, and are handed to the attribute writer in column chunks with the
+densities computed for a whole chunk at once.
+"""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+__revision__ = '$Format:%H$'
+
+import math
+from array import array
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# One chunk of results: fid, count, area and perimeter columns, a count
+# column for every sweep threshold pair and the histogram blobs (or None)
+ResultColumns = namedtuple('ResultColumns', 'fids counts areas perimeters sweeps histograms')
+
+
+def histogramSize(bins):
+    """
+    Returns the byte size of a histogramBytes blob with bins bins, 0 for
+    no histogram.
+    """
+    return (2 * bins + 1) * 4 if bins else 0
+
+
+def densities(counts, perimeters, areas):
+    """
+    Returns the count / perimeter and count / area columns, NaN where the
+    perimeter or the area is not positive.
+    """
+    if np is not None:
+        counts = np.asarray(counts, dtype=np.float64)
+        perimeters = np.asarray(perimeters, dtype=np.float64)
+        areas = np.asarray(areas, dtype=np.float64)
+        dens_perim = np.divide(counts, perimeters, out=np.full(len(counts), np.nan), where=perimeters > 0)
+        dens_area = np.divide(counts, areas, out=np.full(len(counts), np.nan), where=areas > 0)
+        return dens_perim, dens_area
+    return ([count / perimeter if perimeter > 0 else math.nan for count, perimeter in zip(counts, perimeters)],
+            [count / area if area > 0 else math.nan for count, area in zip(counts, areas)])
+
+
+def _values(column):
+    """
+    Returns a float column as a list with None instead of NaN, the value
+    written for the zero guarded densities.
+    """
+    if np is not None:
+        column = np.asarray(column, dtype=np.float64).tolist()
+    return [None if value != value else float(value) for value in column]
+
+
+def attributeRows(columns):
+    """
+    Yields (fid, count, dens_perim, dens_area, sweep, histogram) for every
+    row of a ResultColumns chunk, where sweep is a (count, dens_perim,
+    dens_area) tuple for every threshold pair and histogram a blob or None.
+    Densities of zero perimeters or areas are None.
+    """
+    dens_perim, dens_area = (_values(column) for column in densities(columns.counts, columns.perimeters,
+                                                                        columns.areas))
+    sweeps = []
+    for counts in columns.sweeps:
+        sweep_perim, sweep_area = densities(counts, columns.perimeters, columns.areas)
+        sweeps.append(list(zip(_values(counts), _values(sweep_perim), _values(sweep_area))))
+    sweeps = list(zip(*sweeps)) if sweeps else [()] * len(columns.fids)
+    histograms = columns.histograms if columns.histograms is not None else [None] * len(columns.fids)
+    fids = columns.fids.tolist()
+    yield from zip(fids, _values(columns.counts), dens_perim, dens_area, sweeps, histograms)
+
+
+def resultSummary(store, chunkSize=100000):
+    """
+    Returns the layer level totals of a result store: the number of
+    features and break points, the total perimeter and area, the mean BPI
+    and the break point densities of the whole layer (None when zero).
+    """
+    features = breakPoints = 0
+    perimeter = area = 0.0
+    for columns in store.columnChunks(chunkSize):
+        features += len(columns.fids)
+        if np is not None:
+            breakPoints += int(np.sum(np.asarray(columns.counts, dtype=np.int64)))
+            perimeter += float(np.sum(np.asarray(columns.perimeters, dtype=np.float64)))
+            area += float(np.sum(np.asarray(columns.areas, dtype=np.float64)))
+        else:
+            breakPoints += sum(columns.counts)
+            perimeter += math.fsum(columns.perimeters)
+            area += math.fsum(columns.areas)
+    return {'features': features,
+            'breakPoints': breakPoints,
+            'perimeter': perimeter,
+            'area': area,
+            'meanBpi': breakPoints / features if features else None,
+            'densPerim': breakPoints / perimeter if perimeter > 0 else None,
+            'densArea': breakPoints / area if area > 0 else None}
+
+
+class ResultStore:
+    """
+    Per feature results in parallel typed arrays, in the order they were
+    added: 8 bytes per column and feature, plus the histogram blobs of
+    histogramBytes bytes each.
+    """
+
+    def __init__(self, pairCount=0, histogramBytes=0):
+        self.histogramBytes = histogramBytes
+        self.fids = array('q')
+        self.counts = array('q')
+        self.areas = array('d')
+        self.perimeters = array('d')
+        self.sweeps = [array('q') for _ in range(pairCount)]
+        self.histograms = bytearray()
+
+    def __len__(self):
+        return len(self.fids)
+
+    def add(self, fid, count, area, perimeter, sweep=None, histogram=None):
+        self.fids.append(fid)
+        self.counts.append(count)
+        self.areas.append(area)
+        self.perimeters.append(perimeter)
+        for column, value in zip(self.sweeps, sweep or ()):
+            column.append(value)
+        if self.histogramBytes:
+            self.histograms += histogram
+
+    def columnChunks(self, chunkSize):
+        """
+        Yields the results as ResultColumns of at most chunkSize rows.
+        """
+        size = self.histogramBytes
+        for start in range(0, len(self.fids), max(1, chunkSize)):
+            end = min(start + chunkSize, len(self.fids))
+            yield ResultColumns(self.fids[start:end], self.counts[start:end], self.areas[start:end],
+                                self.perimeters[start:end], [column[start:end] for column in self.sweeps],
+                                [bytes(self.histograms[i * size:(i + 1) * size]) for i in range(start, end)]
+                                if size else None)
+
+    def close(self):
+        pass
@@ -0,0 +1,115 @@
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+__revision__ = '$Format:%H$'
+
+from qgis.PyQt.QtCore import QByteArray
+from qgis.core import (QgsPointXY,
+                       QgsGeometry,
+                       QgsFeature,
+                       QgsFeatureSink,
+                       QgsProcessingException)
+
+from .break_pointer_wkb import encodeMultiPoint
+from .break_pointer_results import ResultStore, attributeRows
+
+
+class BreakPointSink:
+    """
+    Buffers the break point features and writes them to the output sink
+    with one addFeatures call per batch. The sink copies the features it
+    receives, so the buffered QgsFeature objects are reused between batches.
+    """
+
+    def __init__(self, sink, batchSize):
+        self.sink = sink
+        self.batchSize = max(1, int(batchSize))
+        self.features = []
+        self.used = 0
+        self.written = 0
+
+    def addPoint(self, x, y, attributes):
+        if self.used == len(self.features):
+            self.features.append(QgsFeature())
+        feat = self.features[self.used]
+        feat.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(x, y)))
+        feat.setAttributes(attributes)
+        self.used += 1
+        if self.used >= self.batchSize:
+            self.flush()
+
+    def addMultiPoint(self, xs, ys, attributes):
+        if self.used == len(self.features):
+            self.features.append(QgsFeature())
+        feat = self.features[self.used]
+        geom = QgsGeometry()
+        geom.fromWkb(encodeMultiPoint(xs, ys))
+        feat.setGeometry(geom)
+        feat.setAttributes(attributes)
+        self.used += 1
+        if self.used >= self.batchSize:
+            self.flush()
+
+    def flush(self):
+        if not self.used:
+            return
+        batch = self.features if self.used == len(self.features) else self.features[:self.used]
+        if not self.sink.addFeatures(batch, QgsFeatureSink.FastInsert):
+            raise QgsProcessingException('Could not write break points to the output layer')
+        self.written += self.used
+        self.used = 0
+
+
+class ResultSink:
+    """
+    Buffers the per polygon results and writes them, with the densities
+    of attributeRows, to a polygon or table sink with one addFeatures call
+    per batch. Every feature gets its leading attribute values (the source
+    attributes or the fid) and geometry, then the count, the densities,
+    the sweep fields and the histogram blob if histogramBytes is set.
+    attributeIndices holds the source attributes copied to a polygon
+    layer, None for a table of fids.
+    """
+
+    def __init__(self, sink, batchSize, pairCount=0, histogramBytes=0, attributeIndices=None):
+        self.sink = sink
+        self.attributeIndices = attributeIndices
+        self.batchSize = max(1, int(batchSize))
+        self.pairCount = pairCount
+        self.histogramBytes = histogramBytes
+        self.store = ResultStore(pairCount, histogramBytes)
+        self.leading = []
+        self.geometries = []
+        self.written = 0
+
+    def add(self, fid, count, area, perimeter, sweep=None, histogram=None, leading=(), geometry=None):
+        self.store.add(fid, count, area, perimeter, sweep, histogram)
+        self.leading.append(list(leading))
+        self.geometries.append(geometry)
+        if len(self.store) >= self.batchSize:
+            self.flush()
+
+    def flush(self):
+        if not len(self.store):
+            return
+        features = []
+        columns = next(self.store.columnChunks(len(self.store)))
+        for (fid, count, dens_perim, dens_area, sweep, histogram), leading, geometry in zip(
+                attributeRows(columns), self.leading, self.geometries):
+            feat = QgsFeature()
+            if geometry is not None:
+                feat.setGeometry(geometry)
+            attributes = leading + [count, dens_perim, dens_area]
+            for values in sweep:
+                attributes.extend(values)
+            if self.histogramBytes:
+                attributes.append(QByteArray(histogram))
+            feat.setAttributes(attributes)
+            features.append(feat)
+        if not self.sink.addFeatures(features, QgsFeatureSink.FastInsert):
+            raise QgsProcessingException('Could not write the polygon results')
+        self.written += len(features)
+        self.store = ResultStore(self.pairCount, self.histogramBytes)
+        self.leading = []
+        self.geometries = []
@@ -0,0 +1,94 @@
+"""
+Temporary file store of the per polygon results of a streaming run.
+
+Instead of keeping the results of every feature until the attributes are
+written back, they are packed into fixed size records in a temporary file
+and read back in chunks, so memory use stays flat no matter how many
+features the layer has.
+"""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+__revision__ = '$Format:%H$'
+
+import struct
+import tempfile
+from array import array
+
+from .break_pointer_results import ResultColumns
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class ResultSpill:
+    """
+    ResultStore writing every feature as one record: fid, count, area,
+    perimeter, the sweep counts of pairCount threshold pairs and a
+    histogram blob of histogramBytes bytes. Records are buffered up to
+    bufferBytes before they are written out.
+    """
+
+    def __init__(self, pairCount=0, histogramBytes=0, bufferBytes=8 * 1024 * 1024, folder=None):
+        self.pairCount = pairCount
+        self.histogramBytes = histogramBytes
+        self.record = struct.Struct(f'<qqdd{pairCount}q{histogramBytes}s')
+        self.bufferRecords = max(1, bufferBytes // self.record.size)
+        self.buffer = []
+        self.count = 0
+        self.file = tempfile.TemporaryFile(prefix='bpi_results_', dir=folder)
+
+    def __len__(self):
+        return self.count
+
+    def add(self, fid, count, area, perimeter, sweep=None, histogram=None):
+        self.buffer.append(self.record.pack(fid, count, area, perimeter, *(sweep or [0] * self.pairCount),
+                                            histogram or b''))
+        self.count += 1
+        if len(self.buffer) >= self.bufferRecords:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write(b''.join(self.buffer))
+            self.buffer = []
+
+    def unpack(self, data):
+        """
+        Returns the ResultColumns of a block of records.
+        """
+        if np is not None:
+            fields = [('fid', '<i8'), ('count', '<i8'), ('area', '<f8'), ('perimeter', '<f8')]
+            fields += [(f'sweep{i}', '<i8') for i in range(self.pairCount)]
+            if self.histogramBytes:
+                fields.append(('histogram', f'V{self.histogramBytes}'))
+            records = np.frombuffer(data, dtype=np.dtype(fields))
+            return ResultColumns(records['fid'], records['count'], records['area'], records['perimeter'],
+                                 [records[f'sweep{i}'] for i in range(self.pairCount)],
+                                 [value.tobytes() for value in records['histogram']] if self.histogramBytes else None)
+        rows = list(self.record.iter_unpack(data))
+        columns = list(zip(*rows))
+        return ResultColumns(array('q', columns[0]), array('q', columns[1]), array('d', columns[2]),
+                             array('d', columns[3]), [array('q', column) for column in columns[4:4 + self.pairCount]],
+                             list(columns[-1]) if self.histogramBytes else None)
+
+    def columnChunks(self, chunkSize):
+        """
+        Yields the results as ResultColumns of at most chunkSize rows, in
+        the order they were added.
+        """
+        self.flush()
+        self.file.seek(0)
+        while True:
+            data = self.file.read(max(1, chunkSize) * self.record.size)
+            if not data:
+                break
+            yield self.unpack(data)
+        self.file.seek(0, 2)
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,141 @@
+"""
+Synthetic polygon landscapes for the benchmarks.
+
+Every generator returns a list of (wkb, category) records built from a
+seeded random generator, so the same seed always gives the same landscape.
+"""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+__revision__ = '$Format:%H$'
+
+import math
+import random
+import struct
+import sys
+from array import array
+
+CATEGORIES = ('forest', 'grassland', 'arable', 'water', 'urban', 'wetland')
+
+
+def _ringWkb(ring):
+    """
+    Returns the little-endian point count and coordinates of a ring given
+    as (x, y) tuples, closing it if needed.
+    """
+    if ring[0] != ring[-1]:
+        ring = ring + [ring[0]]
+    coords = array('d', [value for point in ring for value in point])
+    if sys.byteorder != 'little':
+        coords.byteswap()
+    return struct.pack('<I', len(ring)) + coords.tobytes()
+
+
+def polygonWkb(rings):
+    return struct.pack('<BII', 1, 3, len(rings)) + b''.join(_ringWkb(ring) for ring in rings)
+
+
+def multiPolygonWkb(polygons):
+    return struct.pack('<BII', 1, 6, len(polygons)) + b''.join(polygonWkb(rings) for rings in polygons)
+
+
+def starRing(rnd, cx, cy, radius, vertices, spikiness=0.5):
+    """
+    Returns a counter-clockwise star shaped ring around (cx, cy) with
+    random radii between (1 - spikiness) * radius and radius.
+    """
+    step = 2 * math.pi / vertices
+    ring = []
+    for i in range(vertices):
+        angle = i * step + rnd.uniform(0, step * 0.5)
+        r = radius * rnd.uniform(1 - spikiness, 1)
+        ring.append((cx + r * math.cos(angle), cy + r * math.sin(angle)))
+    return ring
+
+
+def starPolygons(count, vertices=32, seed=0):
+    """
+    Random star polygons of about vertices vertices scattered on a square.
+    """
+    rnd = random.Random(seed)
+    side = math.sqrt(count) * 100
+    return [(polygonWkb([starRing(rnd, rnd.uniform(0, side), rnd.uniform(0, side), 40,
+                                  max(3, int(rnd.uniform(0.5, 1.5) * vertices)))]),
+             rnd.choice(CATEGORIES)) for _ in range(count)]
+
+
+def tessellation(count, edgeVertices=3, seed=0):
+    """
+    A jittered grid of about count cells like a land cover map: the
+    neighbouring cells share their boundary vertices exactly, every edge is
+    split into edgeVertices + 1 jittered segments. Categories come in
+    patches of neighbouring cells.
+    """
+    rnd = random.Random(seed)
+    columns = max(1, int(math.sqrt(count)))
+    rows = max(1, -(-count // columns))
+    nodes = [[(i * 100 + rnd.uniform(-30, 30), j * 100 + rnd.uniform(-30, 30)) for j in range(rows + 1)]
+             for i in range(columns + 1)]
+
+    def edge(a, b):
+        """The inner vertices of the edge a-b, the same for both neighbours."""
+        key = (a, b) if a < b else (b, a)
+        if key not in edges:
+            local = random.Random(hash(key) ^ seed)
+            (x1, y1), (x2, y2) = key
+            edges[key] = [(x1 + (x2 - x1) * k / (edgeVertices + 1) + local.uniform(-8, 8),
+                           y1 + (y2 - y1) * k / (edgeVertices + 1) + local.uniform(-8, 8))
+                          for k in range(1, edgeVertices + 1)]
+        inner = edges[key]
+        return inner if key[0] == a else inner[::-1]
+
+    edges = {}
+    patches = {}
+    records = []
+    for i in range(columns):
+        for j in range(rows):
+            if len(records) == count:
+                break
+            corners = [nodes[i][j], nodes[i + 1][j], nodes[i + 1][j + 1], nodes[i][j + 1]]
+            ring = []
+            for k in range(4):
+                ring.append(corners[k])
+                ring.extend(edge(corners[k], corners[(k + 1) % 4]))
+            patch = (i // 3, j // 3)
+            if patch not in patches:
+                patches[patch] = rnd.choice(CATEGORIES)
+            records.append((polygonWkb([ring]), patches[patch]))
+    return records
+
+
+def holedMultiPolygons(count, parts=3, holes=2, vertices=24, seed=0):
+    """
+    Multipolygons of up to parts star shaped parts, each with up to holes
+    small square holes.
+    """
+    rnd = random.Random(seed)
+    side = math.sqrt(count) * 300
+    records = []
+    for _ in range(count):
+        cx, cy = rnd.uniform(0, side), rnd.uniform(0, side)
+        polygons = []
+        for p in range(rnd.randint(1, parts)):
+            px, py = cx + p * 100, cy
+            rings = [starRing(rnd, px, py, 45, vertices, spikiness=0.2)]
+            for h in range(rnd.randint(0, holes)):
+                hx, hy, size = px - 15 + h * 15, py + rnd.uniform(-5, 5), 5
+                # Holes run clockwise
+                rings.append([(hx, hy), (hx, hy + size), (hx + size, hy + size), (hx + size, hy)])
+            polygons.append(rings)
+        records.append((multiPolygonWkb(polygons), rnd.choice(CATEGORIES)))
+    return records
+
+
+def largeRing(vertices=1000000, seed=0):
+    """
+    A single star polygon with the given number of vertices.
+    """
+    rnd = random.Random(seed)
+    return [(polygonWkb([starRing(rnd, 0.0, 0.0, 10000.0, vertices, spikiness=0.05)]), CATEGORIES[0])]
@@ -0,0 +1,140 @@
+"""
+Vertex thinning of polygon rings before the angle evaluation.
+
+Rings digitized densely or vectorized from rasters carry long runs of nearly
+collinear vertices that are never break points. Two filters drop them ring
+by ring, keeping the first and the closing vertex:
+
+* distance thinning drops the vertices closer than the tolerance to the
+  last kept vertex along the ring. Every decision depends on the vertex
+  kept before it, so this one is a plain scan over the ring, and
+* collinear removal drops repeated vertices first, then the vertices
+  lying exactly on the straight line between their neighbours, with
+  numpy array operations when numpy is available.
+
+A ring left with fewer than four vertices is kept as it was.
+"""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+__revision__ = '$Format:%H$'
+
+import math
+
+from .break_pointer_wkb import decodePolygons, encodePolygons
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# A closed triangle, the smallest ring the filters leave
+MIN_RING_VERTICES = 4
+
+
+def thinRing(xs, ys, tolerance=0.0, collinear=False):
+    """
+    Returns the (xs, ys) of a closed ring after distance thinning with
+    tolerance (0 skips it) and with collinear set collinear removal.
+    """
+    n = len(xs)
+    if n <= MIN_RING_VERTICES:
+        return xs, ys
+    if np is None:
+        return _thinRingPython(xs, ys, tolerance, collinear)
+    ringXs = np.asarray(xs, dtype=np.float64)
+    ringYs = np.asarray(ys, dtype=np.float64)
+    if tolerance > 0:
+        keep = np.zeros(len(ringXs), dtype=bool)
+        keep[_radialKeep(ringXs.tolist(), ringYs.tolist(), tolerance)] = True
+        ringXs, ringYs = ringXs[keep], ringYs[keep]
+    if collinear:
+        # Of repeated vertices the last one stays, so the closing vertex is kept
+        keep = np.ones(len(ringXs), dtype=bool)
+        keep[:-1] = (ringXs[:-1] != ringXs[1:]) | (ringYs[:-1] != ringYs[1:])
+        ringXs, ringYs = ringXs[keep], ringYs[keep]
+    if collinear and len(ringXs) > MIN_RING_VERTICES:
+        dx1, dy1 = ringXs[1:-1] - ringXs[:-2], ringYs[1:-1] - ringYs[:-2]
+        dx2, dy2 = ringXs[2:] - ringXs[1:-1], ringYs[2:] - ringYs[1:-1]
+        keep = np.ones(len(ringXs), dtype=bool)
+        keep[1:-1] = (dx1 * dy2 - dy1 * dx2 != 0) | (dx1 * dx2 + dy1 * dy2 < 0)
+        ringXs, ringYs = ringXs[keep], ringYs[keep]
+    if len(ringXs) < MIN_RING_VERTICES:
+        return xs, ys
+    return ringXs, ringYs
+
+
+def _radialKeep(xs, ys, tolerance):
+    """
+    Returns the indices of the first vertex, of every vertex at least
+    tolerance away from the last kept one and of the closing vertex. The
+    last kept vertex changes with every decision, so the ring is scanned
+    vertex by vertex, also on the numpy path.
+    """
+    keep = [0]
+    lastX, lastY = xs[0], ys[0]
+    for i in range(1, len(xs) - 1):
+        if math.hypot(xs[i] - lastX, ys[i] - lastY) >= tolerance:
+            keep.append(i)
+            lastX, lastY = xs[i], ys[i]
+    keep.append(len(xs) - 1)
+    return keep
+
+
+def _thinRingPython(xs, ys, tolerance, collinear):
+    ringXs, ringYs = list(xs), list(ys)
+    if tolerance > 0:
+        keep = _radialKeep(ringXs, ringYs, tolerance)
+        ringXs, ringYs = [ringXs[i] for i in keep], [ringYs[i] for i in keep]
+    if collinear:
+        keep = [i for i in range(len(ringXs) - 1)
+                if ringXs[i] != ringXs[i + 1] or ringYs[i] != ringYs[i + 1]] + [len(ringXs) - 1]
+        ringXs, ringYs = [ringXs[i] for i in keep], [ringYs[i] for i in keep]
+    if collinear and len(ringXs) > MIN_RING_VERTICES:
+        keep = [0]
+        for i in range(1, len(ringXs) - 1):
+            dx1, dy1 = ringXs[i] - ringXs[i - 1], ringYs[i] - ringYs[i - 1]
+            dx2, dy2 = ringXs[i + 1] - ringXs[i], ringYs[i + 1] - ringYs[i]
+            if dx1 * dy2 - dy1 * dx2 != 0 or dx1 * dx2 + dy1 * dy2 < 0:
+                keep.append(i)
+        keep.append(len(ringXs) - 1)
+        ringXs, ringYs = [ringXs[i] for i in keep], [ringYs[i] for i in keep]
+    if len(ringXs) < MIN_RING_VERTICES:
+        return xs, ys
+    return ringXs, ringYs
+
+
+def thinParts(parts, tolerance=0.0, collinear=False):
+    """
+    Returns the decoded polygon parts with every ring thinned by thinRing,
+    and the number of removed vertices.
+    """
+    thinned = []
+    removed = 0
+    for xs, ys, ringOffsets in parts:
+        rings = [thinRing(xs[start:end], ys[start:end], tolerance, collinear)
+                 for start, end in zip(ringOffsets, ringOffsets[1:])]
+        offsets = [0]
+        for ringXs, ringYs in rings:
+            offsets.append(offsets[-1] + len(ringXs))
+        removed += ringOffsets[-1] - offsets[-1]
+        if np is not None:
+            thinned.append((np.concatenate([ring[0] for ring in rings]) if rings else np.empty(0),
+                            np.concatenate([ring[1] for ring in rings]) if rings else np.empty(0), offsets))
+        else:
+            thinned.append(([x for ring in rings for x in ring[0]], [y for ring in rings for y in ring[1]], offsets))
+    return thinned, removed
+
+
+def thinWkb(wkb, tolerance=0.0, collinear=False):
+    """
+    Returns the WKB of a Polygon or MultiPolygon after thinning and the
+    number of removed vertices. The WKB is returned unchanged when no
+    vertex was removed.
+    """
+    parts, removed = thinParts(decodePolygons(wkb), tolerance, collinear)
+    if not removed:
+        return wkb, 0
+    return encodePolygons(parts), removed
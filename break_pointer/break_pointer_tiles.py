@@ -0,0 +1,74 @@
+"""
+Regular tile grid over a layer extent.
+
+Every polygon belongs to exactly one tile, the one holding the lower left
+corner of its bounding box, so a tiled run visits each polygon once even
+when it crosses tile edges.
+"""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+__revision__ = '$Format:%H$'
+
+import math
+
+
+class TileGrid:
+    """
+    Square tiles of tileSize map units covering (xmin, ymin, xmax, ymax),
+    numbered row by row from the lower left corner. Tiles are closed on
+    their lower and left edges; points outside the extent belong to the
+    nearest edge tile.
+    """
+
+    def __init__(self, xmin, ymin, xmax, ymax, tileSize):
+        if tileSize <= 0:
+            raise ValueError('The tile size has to be positive')
+        self.xmin, self.ymin, self.xmax, self.ymax = xmin, ymin, xmax, ymax
+        self.tileSize = tileSize
+        self.columns = max(1, math.ceil((xmax - xmin) / tileSize))
+        self.rows = max(1, math.ceil((ymax - ymin) / tileSize))
+
+    def __len__(self):
+        return self.columns * self.rows
+
+    def tileIndex(self, x, y):
+        column = min(max(int((x - self.xmin) // self.tileSize), 0), self.columns - 1)
+        row = min(max(int((y - self.ymin) // self.tileSize), 0), self.rows - 1)
+        return row * self.columns + column
+
+    def tileRect(self, index):
+        """
+        Returns the (xmin, ymin, xmax, ymax) rectangle to query the
+        features of a tile with. The edge tiles reach out of the extent by
+        a tile size, to also catch bounding boxes rounded outwards.
+        """
+        row, column = divmod(index, self.columns)
+        x0 = self.xmin + column * self.tileSize
+        y0 = self.ymin + row * self.tileSize
+        x1, y1 = x0 + self.tileSize, y0 + self.tileSize
+        if column == 0:
+            x0 -= self.tileSize
+        if row == 0:
+            y0 -= self.tileSize
+        if column == self.columns - 1:
+            x1 = max(x1, self.xmax) + self.tileSize
+        if row == self.rows - 1:
+            y1 = max(y1, self.ymax) + self.tileSize
+        return x0, y0, x1, y1
+
+    def tiles(self):
+        """
+        Yields (index, query rectangle) of every tile.
+        """
+        for index in range(len(self)):
+            yield index, self.tileRect(index)
+
+    def owns(self, index, bounds):
+        """
+        Tells whether the polygon with the (xmin, ymin, xmax, ymax) bounding
+        box belongs to the tile.
+        """
+        return self.tileIndex(bounds[0], bounds[1]) == index
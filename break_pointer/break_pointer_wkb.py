@@ -0,0 +1,202 @@
+"""
+WKB decoding of polygon geometries into coordinate arrays.
+
+The rings are read straight out of the WKB buffer, with numpy as float64
+views of the buffer itself. encodePolygons writes decoded parts back as
+WKB, encodeMultiPoint the break points of a polygon.
+"""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+__revision__ = '$Format:%H$'
+
+import struct
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+WKB_POINT = 1
+WKB_MULTIPOINT = 4
+WKB_POLYGON = 3
+WKB_MULTIPOLYGON = 6
+# EWKB and QGIS 2.5D flags
+WKB_Z_FLAG = 0x80000000
+WKB_M_FLAG = 0x40000000
+WKB_SRID_FLAG = 0x20000000
+
+
+def _readHeader(buffer, pos):
+    """
+    Reads the byte order and geometry type header at pos.
+    Returns (byte order prefix, base type, dimensions, new position).
+    """
+    endian = '<' if buffer[pos] == 1 else '>'
+    wkbType = struct.unpack_from(endian + 'I', buffer, pos + 1)[0]
+    pos += 5
+    dims = 2
+    if wkbType & WKB_Z_FLAG:
+        dims += 1
+    if wkbType & WKB_M_FLAG:
+        dims += 1
+    if wkbType & WKB_SRID_FLAG:
+        pos += 4
+    wkbType &= 0x0fffffff
+    # ISO codes: 1000 for Z, 2000 for M, 3000 for ZM
+    isoDims = wkbType // 1000
+    if isoDims in (1, 2):
+        dims += 1
+    elif isoDims == 3:
+        dims += 2
+    return endian, wkbType % 1000, dims, pos
+
+
+def _readRing(buffer, pos, endian, dims):
+    """
+    Returns (xs, ys, new position) of the ring starting at pos.
+    """
+    count = struct.unpack_from(endian + 'I', buffer, pos)[0]
+    pos += 4
+    size = count * dims
+    if np is not None:
+        coords = np.frombuffer(buffer, dtype=endian + 'f8', count=size, offset=pos).reshape(count, dims)
+        xs, ys = coords[:, 0], coords[:, 1]
+    else:
+        coords = array('d', bytes(buffer[pos:pos + size * 8]))
+        if (endian == '<') != (sys.byteorder == 'little'):
+            coords.byteswap()
+        xs, ys = coords[0::dims], coords[1::dims]
+    return xs, ys, pos + size * 8
+
+
+def _readPolygon(buffer, pos, endian, dims):
+    """
+    Returns ((xs, ys, ringOffsets), new position) of the polygon body at pos.
+    The rings of the polygon follow each other in xs and ys, ringOffsets
+    holds the start of every ring and the total vertex count.
+    """
+    ringCount = struct.unpack_from(endian + 'I', buffer, pos)[0]
+    pos += 4
+    rings = []
+    for _ in range(ringCount):
+        xs, ys, pos = _readRing(buffer, pos, endian, dims)
+        rings.append((xs, ys))
+
+    ringOffsets = [0]
+    for xs, ys in rings:
+        ringOffsets.append(ringOffsets[-1] + len(xs))
+    if len(rings) == 1:
+        xs, ys = rings[0]
+    elif np is not None:
+        xs = np.concatenate([ring[0] for ring in rings]) if rings else np.empty(0)
+        ys = np.concatenate([ring[1] for ring in rings]) if rings else np.empty(0)
+    else:
+        xs, ys = array('d'), array('d')
+        for ringXs, ringYs in rings:
+            xs.extend(ringXs)
+            ys.extend(ringYs)
+    return (xs, ys, ringOffsets), pos
+
+
+def decodePolygons(wkb):
+    """
+    Decodes a Polygon or MultiPolygon WKB (ISO, EWKB or QGIS 2.5D flavour).
+    Returns the list of polygon parts as (xs, ys, ringOffsets) tuples, the
+    same parts asPolygon and asMultiPolygon return. Z and M values are
+    dropped. Raises ValueError for any other geometry type.
+    """
+    if not wkb:
+        return []
+    buffer = memoryview(wkb)
+    endian, wkbType, dims, pos = _readHeader(buffer, 0)
+    if wkbType == WKB_POLYGON:
+        part, pos = _readPolygon(buffer, pos, endian, dims)
+        return [part]
+    if wkbType != WKB_MULTIPOLYGON:
+        raise ValueError(f'Unsupported WKB geometry type: {wkbType}')
+
+    partCount = struct.unpack_from(endian + 'I', buffer, pos)[0]
+    pos += 4
+    parts = []
+    for _ in range(partCount):
+        endian, wkbType, dims, pos = _readHeader(buffer, pos)
+        if wkbType != WKB_POLYGON:
+            raise ValueError(f'Unsupported WKB geometry type in MultiPolygon: {wkbType}')
+        part, pos = _readPolygon(buffer, pos, endian, dims)
+        parts.append(part)
+    return parts
+
+
+def _polygonVertices(buffer, pos, endian, dims):
+    """
+    Returns (vertex count, new position) of the polygon body at pos.
+    """
+    ringCount = struct.unpack_from(endian + 'I', buffer, pos)[0]
+    pos += 4
+    vertices = 0
+    for _ in range(ringCount):
+        count = struct.unpack_from(endian + 'I', buffer, pos)[0]
+        vertices += count
+        pos += 4 + count * dims * 8
+    return vertices, pos
+
+
+def vertexCount(wkb):
+    """
+    Returns the number of vertices of a Polygon or MultiPolygon WKB, closing
+    vertices included, reading only the ring headers.
+    """
+    if not wkb:
+        return 0
+    buffer = memoryview(wkb)
+    endian, wkbType, dims, pos = _readHeader(buffer, 0)
+    if wkbType == WKB_POLYGON:
+        return _polygonVertices(buffer, pos, endian, dims)[0]
+    if wkbType != WKB_MULTIPOLYGON:
+        raise ValueError(f'Unsupported WKB geometry type: {wkbType}')
+    partCount = struct.unpack_from(endian + 'I', buffer, pos)[0]
+    pos += 4
+    vertices = 0
+    for _ in range(partCount):
+        endian, wkbType, dims, pos = _readHeader(buffer, pos)
+        count, pos = _polygonVertices(buffer, pos, endian, dims)
+        vertices += count
+    return vertices
+
+
+def encodePolygons(parts):
+    """
+    Returns the little-endian 2D MultiPolygon WKB of decoded polygon parts.
+    """
+    chunks = [struct.pack('<BII', 1, WKB_MULTIPOLYGON, len(parts))]
+    for xs, ys, ringOffsets in parts:
+        chunks.append(struct.pack('<BII', 1, WKB_POLYGON, len(ringOffsets) - 1))
+        for start, end in zip(ringOffsets, ringOffsets[1:]):
+            chunks.append(struct.pack('<I', end - start))
+            if np is not None:
+                chunks.append(np.column_stack([np.asarray(xs[start:end], dtype='<f8'),
+                                               np.asarray(ys[start:end], dtype='<f8')]).tobytes())
+            else:
+                coordinates = [value for xy in zip(xs[start:end], ys[start:end]) for value in xy]
+                chunks.append(struct.pack(f'<{len(coordinates)}d', *coordinates))
+    return b''.join(chunks)
+
+
+def encodeMultiPoint(xs, ys):
+    """
+    Returns the little-endian 2D MultiPoint WKB of the points.
+    """
+    header = struct.pack('<BII', 1, WKB_MULTIPOINT, len(xs))
+    if np is not None:
+        points = np.empty(len(xs), dtype=[('order', 'u1'), ('type', '<u4'), ('x', '<f8'), ('y', '<f8')])
+        points['order'] = 1
+        points['type'] = WKB_POINT
+        points['x'] = xs
+        points['y'] = ys
+        return header + points.tobytes()
+    return header + b''.join(struct.pack('<BIdd', 1, WKB_POINT, x, y) for x, y in zip(xs, ys))
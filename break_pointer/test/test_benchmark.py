@@ -0,0 +1,65 @@
+# coding=utf-8
+"""Tests for the synthetic landscapes and the benchmark report."""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+import json
+import os
+import tempfile
+import unittest
+
+from .. import break_pointer_synthetic as synthetic
+from .. import break_pointer_benchmark as benchmark
+from ..break_pointer_wkb import decodePolygons
+from ..break_pointer_categories import CategoryIndex
+
+
+class SyntheticTest(unittest.TestCase):
+    """Test the shape of the generated landscapes."""
+
+    def test_generators(self):
+        """Generators are seeded and give the requested sizes."""
+        self.assertEqual(synthetic.starPolygons(5, seed=2), synthetic.starPolygons(5, seed=2))
+        self.assertEqual(len(synthetic.tessellation(10)), 10)
+        parts = decodePolygons(synthetic.largeRing(5000)[0][0])
+        self.assertEqual(len(parts[0][0]), 5001)
+        for wkb, category in synthetic.holedMultiPolygons(20, seed=1):
+            self.assertIn(category, synthetic.CATEGORIES)
+            for xs, ys, ringOffsets in decodePolygons(wkb):
+                self.assertLessEqual(len(ringOffsets), 4)
+
+    def test_shared_boundaries(self):
+        """Neighbouring tessellation cells share their boundary segments."""
+        index = CategoryIndex(topological=True)
+        for fid, (wkb, category) in enumerate(synthetic.tessellation(16, seed=3)):
+            for xs, ys, ringOffsets in decodePolygons(wkb):
+                index.addSegments(xs, ys, ringOffsets, fid)
+        # A 4 x 4 grid has 24 inner edges of 4 segments each
+        self.assertEqual(len(list(index.sharedSegments())), 24 * 4)
+
+
+class BenchmarkTest(unittest.TestCase):
+    """Test the report of a tiny benchmark run."""
+
+    def test_report(self):
+        report = benchmark.runBenchmarks(['tiny'], tierSizes={'tiny': {'features': 9, 'vertices': 100}})
+        self.assertEqual([result['generator'] for result in report['results']], list(benchmark.GENERATORS))
+        for result in report['results']:
+            self.assertEqual(set(result['stages']), {'decode', 'measure', 'breakPoints', 'categoryIndex',
+                                                     'resultStore', 'setAttributes', 'saveTxt', 'total'})
+            self.assertEqual(set(result['kernels']), {'numpy', 'python'})
+            self.assertGreater(result['kernels']['python'], 0)
+        self.assertEqual(report['results'][-1]['vertices'], 101)
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'bench.json')
+            benchmark.main(['--generators', 'ring', '--output', path])
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(json.load(f)['results'][0]['tier'], 'small')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+# coding=utf-8
+"""Tests for the persistent vertex angle cache."""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+import os
+import tempfile
+import unittest
+
+from ..break_pointer_cache import AngleCache
+from ..break_pointer_parallel import breakPointResults
+from .test_parallel import random_records
+
+
+class AngleCacheTest(unittest.TestCase):
+    """Test cached reruns and the size limit."""
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, 'layer.gpkg.bpi_cache.sqlite')
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_rerun(self):
+        """Reruns with other thresholds read the angles from the cache."""
+        records = random_records(6, 30)
+        for lower, upper in ((20, 160), (40, 120), (20, 160)):
+            cache = AngleCache(self.path)
+            results = list(breakPointResults(records, lower, upper, True, chunkSize=8, cache=cache,
+                                             thresholdPairs=[(30, 150)], histogramBins=36))
+            cache.close()
+            self.assertEqual(results, list(breakPointResults(records, lower, upper, True,
+                                                             thresholdPairs=[(30, 150)], histogramBins=36)))
+        self.assertEqual((cache.hits, cache.misses), (30, 0))
+
+        cache = AngleCache(self.path)
+        list(breakPointResults(records[:5], 20, 160, False, cache=cache))
+        cache.close()
+        self.assertEqual((cache.hits, cache.misses), (0, 5))
+
+    def test_eviction(self):
+        """Entries of the oldest runs are evicted above the size limit."""
+        angles = ([1.0] * 10,) * 5
+        cache = AngleCache(self.path, maxBytes=3 * 400)
+        cache.put(b'first', angles)
+        cache.put(b'second', angles)
+        self.assertEqual(cache.close(), 0)
+
+        cache = AngleCache(self.path, maxBytes=3 * 400)
+        self.assertIsNotNone(cache.get(b'second'))
+        cache.put(b'third', angles)
+        cache.put(b'fourth', angles)
+        self.assertEqual(cache.close(), 1)
+
+        cache = AngleCache(self.path)
+        self.assertIsNone(cache.get(b'first'))
+        self.assertEqual(list(cache.get(b'second')[2]), [1.0] * 10)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
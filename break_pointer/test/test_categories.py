@@ -0,0 +1,82 @@
+# coding=utf-8
+"""Tests for the category pair inverted index."""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+import random
+import unittest
+from itertools import combinations
+
+from ..break_pointer_categories import CategoryIndex
+
+
+def random_index(seed):
+    rnd = random.Random(seed)
+    index = CategoryIndex()
+    categoryPoints = {}
+    for _ in range(3000):
+        point = (float(rnd.randint(0, 40)), float(rnd.randint(0, 40)))
+        category = rnd.choice(['forest', 'grass', 'urban', 'water', 112, 311])
+        index.add(point, category)
+        categoryPoints.setdefault(category, set()).add(point)
+    return index, categoryPoints
+
+
+class CategoryIndexTest(unittest.TestCase):
+    """Test the index against pairwise set intersections."""
+
+    def test_pair_counts(self):
+        """The pair table matches the set intersection of every pair."""
+        index, categoryPoints = random_index(4)
+        expected = {(cat1, cat2): len(categoryPoints[cat1] & categoryPoints[cat2])
+                    for cat1, cat2 in combinations(list(categoryPoints), 2)}
+        counts = index.categoryPairsCounts()
+        self.assertEqual(list(counts.items()), list(expected.items()))
+
+    def test_pair_points(self):
+        """The shared points of every pair are the set intersections."""
+        index, categoryPoints = random_index(5)
+        categories = index.categoryList()
+        for (i, j), points in index.pairPoints().items():
+            self.assertEqual(set(points), categoryPoints[categories[i]] & categoryPoints[categories[j]])
+            self.assertEqual(len(points), len(set(points)))
+
+    def test_sparse_matrix(self):
+        """The sparse matrix lists the nonzero pairs in row order."""
+        index = CategoryIndex()
+        for point, category in (((0, 0), 'a'), ((0, 0), 'b'), ((1, 1), 'b'), ((1, 1), 'c'),
+                                ((2, 2), 'a'), ((2, 2), 'b'), ((2, 2), 'c'), ((2, 2), 'c')):
+            index.add(point, category)
+        self.assertEqual(index.sparseMatrix(), (['a', 'b', 'c'], [0, 0, 1], [1, 2, 2], [2, 1, 2]))
+        self.assertEqual(index.categoryPairsCounts(), {('a', 'b'): 2, ('a', 'c'): 1, ('b', 'c'): 2})
+
+    def test_pair_lengths(self):
+        """Shared boundary segments give the true shared edge length."""
+        index = CategoryIndex(topological=True)
+        # A 10 x 10 forest square with a grass neighbour on the right and a
+        # water neighbour on top sharing half of its top edge
+        forest = ([0.0, 10.0, 10.0, 10.0, 5.0, 0.0, 0.0], [0.0, 0.0, 4.0, 10.0, 10.0, 10.0, 0.0])
+        grass = ([10.0, 20.0, 20.0, 10.0, 10.0, 10.0], [0.0, 0.0, 10.0, 10.0, 4.0, 0.0])
+        water = ([5.0, 10.0, 10.0, 5.0, 5.0], [10.0, 10.0, 12.0, 12.0, 10.0])
+        index.addSegments(*forest, [0, 7], 'forest')
+        index.addSegments(*grass, [0, 6], 'grass')
+        index.addSegments(*water, [0, 5], 'water')
+        index.addSegments(*forest, [0, 7], 'forest')
+        self.assertEqual(index.pairLengths(), {(0, 1): 10.0, (0, 2): 5.0})
+        self.assertEqual(index.pairMetrics(), {('forest', 'grass'): (0, 10.0), ('forest', 'water'): (0, 5.0),
+                                               ('grass', 'water'): (0, 0.0)})
+
+    def test_pair_metrics(self):
+        """Without segments the edge length follows the shared points around their centroid."""
+        index = CategoryIndex()
+        for point in ((0.0, 0.0), (3.0, 4.0), (6.0, 0.0)):
+            index.add(point, 'a')
+            index.add(point, 'b')
+        index.add((9.0, 9.0), 'c')
+        self.assertEqual(index.pairMetrics(), {('a', 'b'): (3, 11.0), ('a', 'c'): (0, 0.0), ('b', 'c'): (0, 0.0)})
+
+
+if __name__ == '__main__':
+    unittest.main()
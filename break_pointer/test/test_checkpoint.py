@@ -0,0 +1,75 @@
+# coding=utf-8
+"""Tests for the checkpoint journal of resumable runs."""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+import os
+import tempfile
+import unittest
+from functools import partial
+from itertools import islice
+
+from ..break_pointer_checkpoint import CheckpointJournal, runSignature
+from ..break_pointer_parallel import breakPointResults
+from .test_parallel import random_records
+
+
+class CheckpointJournalTest(unittest.TestCase):
+    """Test that an interrupted run resumes with every feature once."""
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, 'layer.gpkg.bpi_checkpoint.sqlite')
+        self.records = random_records(5, 30)
+        self.compute = partial(breakPointResults, LowerT=20, UpperT=160, InnerRings=True, chunkSize=4,
+                               thresholdPairs=[(30, 150)], histogramBins=12)
+        self.signature = runSignature(LowerT=20, UpperT=160)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_resume(self):
+        """A rerun replays the journaled features and computes the rest."""
+        expected = list(self.compute(self.records))
+        journal = CheckpointJournal(self.path, self.signature, commitEvery=5)
+        self.assertEqual(list(islice(journal.resume(self.records, self.compute), 12)), expected[:12])
+        journal.close()
+
+        computed = []
+
+        def compute(records):
+            records = list(records)
+            computed.extend(record[0] for record in records)
+            return self.compute(records)
+
+        journal = CheckpointJournal(self.path, self.signature)
+        self.assertEqual((journal.completed, journal.pointCount),
+                         (12, sum(len(points[0]) for record, points, counts, histogram in expected[:12])))
+        self.assertEqual(list(journal.resume(self.records, compute)), expected)
+        self.assertEqual(computed, list(range(12, 30)))
+        journal.close(remove=True)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_mismatch(self):
+        """Other parameters start over, edited features stop the replay."""
+        journal = CheckpointJournal(self.path, self.signature)
+        list(islice(journal.resume(self.records, self.compute), 10))
+        journal.close()
+        journal = CheckpointJournal(self.path, runSignature(LowerT=30, UpperT=160))
+        self.assertEqual(journal.completed, 0)
+        list(islice(journal.resume(self.records, self.compute), 10))
+        journal.close()
+
+        records = list(self.records)
+        records[4] = (4, self.records[5][1], 'id4')
+        journal = CheckpointJournal(self.path, runSignature(LowerT=30, UpperT=160))
+        with self.assertRaises(ValueError):
+            list(journal.resume(records, self.compute))
+        self.assertEqual(journal.completed, 0)
+        journal.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+# coding=utf-8
+"""Tests for the columnar break point export."""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+import os
+import json
+import math
+import struct
+import tempfile
+import unittest
+from array import array
+from unittest import mock
+
+from .. import break_pointer_columnar as columnar
+
+POINTS = ([1.0, 2.0, 3.0], [4.0, 5.0, 6.0], [30.0, 40.0, 50.0], [10.0, 20.0, 30.0], [-10.0, -20.0, -30.0])
+
+
+def export(path, batchSize):
+    table = columnar.ColumnarExport(path, batchSize=batchSize)
+    table.addPoints(7, POINTS)
+    table.addMetrics(7, 3, 12.0, 0.0)
+    table.addPoints(8, ([], [], [], [], []))
+    table.addMetrics(8, 0, 4.0, 1.0)
+    table.close()
+    return table
+
+
+class ColumnarTest(unittest.TestCase):
+    """Test both the GeoParquet and the raw column layout."""
+
+    def test_geoparquet(self):
+        """Batches end up in one GeoParquet file with WKB points."""
+        if columnar.pa is None:
+            self.skipTest('pyarrow is not available')
+        with tempfile.TemporaryDirectory() as folder:
+            table = export(os.path.join(folder, 'bpi.parquet'), 2)
+            self.assertEqual(table.pointsPath, os.path.join(folder, 'bpi.parquet'))
+            self.assertTrue(os.path.isfile(table.metricsPath))
+            points = columnar.pq.read_table(table.pointsPath)
+            self.assertEqual(points.column('x').to_pylist(), POINTS[0])
+            self.assertEqual(points.column('angle2').to_pylist(), POINTS[4])
+            self.assertEqual(points.column('fid').to_pylist(), [7, 7, 7])
+            geometry = [struct.unpack('<BIdd', wkb) for wkb in points.column('geometry').to_pylist()]
+            self.assertEqual(geometry, [(1, 1, 1.0, 4.0), (1, 1, 2.0, 5.0), (1, 1, 3.0, 6.0)])
+            geo = json.loads(points.schema.metadata[b'geo'])
+            self.assertEqual(geo['primary_column'], 'geometry')
+
+            metrics = columnar.pq.read_table(table.metricsPath).to_pydict()
+            self.assertEqual(metrics['fid'], [7, 8])
+            self.assertEqual(metrics['dens_perim'], [0.25, 0.0])
+            self.assertTrue(math.isnan(metrics['dens_area'][0]))
+
+    def test_raw_columns(self):
+        """Without pyarrow the columns are raw binary files."""
+        with mock.patch.object(columnar, 'pa', None), tempfile.TemporaryDirectory() as folder:
+            table = export(os.path.join(folder, 'bpi.parquet'), 2)
+            pointsFolder = os.path.join(folder, 'bpi_columns')
+            self.assertEqual(table.pointsPath, pointsFolder)
+            self.assertEqual(table.metricsPath, os.path.join(folder, 'bpi_metrics_columns'))
+            self.assertTrue(os.path.isdir(table.metricsPath))
+            self.assertFalse(os.path.exists(os.path.join(folder, 'bpi.parquet')))
+            with open(os.path.join(pointsFolder, 'schema.json'), encoding='utf-8') as f:
+                schema = json.load(f)
+            self.assertEqual(schema['rows'], 3)
+            values = array('d')
+            with open(os.path.join(pointsFolder, 'y.bin'), 'rb') as f:
+                values.fromfile(f, 3)
+            self.assertEqual(list(values), POINTS[1])
+            counts = array('q')
+            with open(os.path.join(table.metricsPath, 'count.bin'), 'rb') as f:
+                counts.fromfile(f, 2)
+            self.assertEqual(list(counts), [3, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
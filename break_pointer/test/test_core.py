@@ -0,0 +1,59 @@
+# coding=utf-8
+"""Tests for the headless core entry point."""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+import os
+import sys
+import subprocess
+import unittest
+
+from .. import break_pointer_core as core
+from .test_wkb import polygon_wkb, multipolygon_wkb
+
+SQUARE = [(0.0, 0.0), (10.0, 0.0), (10.0, 10.0), (0.0, 10.0), (0.0, 0.0)]
+HOLE = [(2.0, 2.0), (2.0, 4.0), (4.0, 4.0), (4.0, 2.0), (2.0, 2.0)]
+
+
+class CoreTest(unittest.TestCase):
+    """Test the metrics of plain coordinate arrays and WKB."""
+
+    def test_polygon_metrics(self):
+        """Area and perimeter include the holes, densities use them."""
+        rings = SQUARE + HOLE
+        result = core.analyzePolygon([p[0] for p in rings], [p[1] for p in rings], [0, 5, 10])
+        self.assertEqual((result.area, result.perimeter), (96.0, 48.0))
+        self.assertEqual(result.count, len(result.points[0]))
+        self.assertEqual(result.densPerim, result.count / 48.0)
+        self.assertEqual(result.densArea, result.count / 96.0)
+        self.assertEqual(core.analyzeWkb(polygon_wkb([SQUARE, HOLE])), result)
+
+    def test_parts(self):
+        """Part offsets split the rings into parts like a MultiPolygon."""
+        moved = [(x + 20, y) for x, y in SQUARE]
+        rings = SQUARE + HOLE + moved
+        xs, ys = [p[0] for p in rings], [p[1] for p in rings]
+        result = core.analyzePolygon(xs, ys, [0, 5, 10, 15], [0, 2, 3], InnerRings=False)
+        self.assertEqual(result, core.analyzeWkb(multipolygon_wkb([[SQUARE, HOLE], [moved]]), InnerRings=False))
+        self.assertEqual((result.count, result.area), (4, 196.0))
+        self.assertIsNone(core.analyzePolygon([0.0, 1.0], [0.0, 0.0]).densArea)
+
+    def test_wkbs(self):
+        """The batch entry point returns the single polygon results in order."""
+        wkbs = [polygon_wkb([SQUARE]), polygon_wkb([SQUARE, HOLE]), multipolygon_wkb([[SQUARE], [HOLE]])]
+        self.assertEqual(list(core.analyzeWkbs(wkbs, 30, 150)), [core.analyzeWkb(wkb, 30, 150) for wkb in wkbs])
+
+    def test_headless_import(self):
+        """The core imports nothing from QGIS."""
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        package = os.path.basename(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        code = (f'import sys; import {package}.break_pointer_core; '
+                f'print(any(name.split(".")[0] in ("qgis", "PyQt5") for name in sys.modules))')
+        output = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), 'False')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+# coding=utf-8
+"""Tests for the local working CRS choice."""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+import unittest
+
+from ..break_pointer_crs import utmZone, localCrsDefinition
+
+
+class LocalCrsTest(unittest.TestCase):
+    """Test the UTM zones and the equal-area fallback."""
+
+    def test_zone(self):
+        self.assertEqual([utmZone(lon) for lon in (-180, -177.5, 0, 19.04, 179.99, 180)], [1, 1, 31, 34, 60, 1])
+
+    def test_definition(self):
+        """Narrow extents get their UTM zone, wide and polar ones LAEA."""
+        self.assertEqual(localCrsDefinition(18.9, 47.3, 19.3, 47.7), 'EPSG:32634')
+        self.assertEqual(localCrsDefinition(-70.8, -33.6, -70.4, -33.3), 'EPSG:32719')
+        self.assertEqual(localCrsDefinition(-10, 35, 30, 70),
+                         '+proj=laea +lat_0=52.500000 +lon_0=10.000000 +x_0=0 +y_0=0 +datum=WGS84 +units=m +no_defs')
+        self.assertTrue(localCrsDefinition(10, 80, 12, 85).startswith('+proj=laea'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+# coding=utf-8
+"""Tests for the array based vertex angle engine."""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+import math
+import random
+import unittest
+from unittest import mock
+
+from .. import break_pointer_engine as engine
+
+
+def reference_angle(a, b, c):
+    """The per vertex angle the algorithm computed with QgsPointXY triplets."""
+    ang1 = math.degrees(math.atan2(a[1] - b[1], a[0] - b[0]))
+    ang2 = math.degrees(math.atan2(c[1] - b[1], c[0] - b[0]))
+    ang = abs(abs(ang2 - ang1) - 180)
+    return ang, ang1, ang2
+
+
+def random_rings(seed, count=50):
+    rnd = random.Random(seed)
+    rings = []
+    for _ in range(count):
+        n = rnd.randint(3, 60)
+        if rnd.random() < 0.5:
+            # Grid vertices produce angles sitting exactly on the thresholds
+            ring = [(float(rnd.randint(0, 6)), float(rnd.randint(0, 6))) for _ in range(n)]
+        else:
+            ring = [(rnd.uniform(-1e5, 1e5), rnd.uniform(-1e5, 1e5)) for _ in range(n)]
+        rings.append(ring + [ring[0]])
+    return rings
+
+
+def reference_results(parts, LowerT, UpperT, InnerRings, thresholdPairs=(), bins=0):
+    """The break points, sweep counts and histogram from the reference angles."""
+    if not InnerRings and parts:
+        parts = engine.largestPart(parts)
+    points, angles = ([], [], [], [], []), []
+    for xs, ys, ringOffsets in parts:
+        xs, ys = engine.trimPart(xs, ys)
+        if xs is None:
+            continue
+        vertices = list(zip(xs, ys))
+        n = len(vertices)
+        for i in range(n):
+            ang, ang1, ang2 = reference_angle(vertices[i - 1], vertices[i], vertices[(i + 1) % n])
+            angles.append(ang)
+            if LowerT <= ang <= UpperT:
+                for column, value in zip(points, (xs[i], ys[i], ang, ang1, ang2)):
+                    column.append(value)
+    counts = [sum(lower <= angle <= upper for angle in angles) for lower, upper in thresholdPairs]
+    with mock.patch.object(engine, 'np', None):
+        histogram = engine.angleHistogram(angles, bins) if bins else None
+    return points, counts, histogram
+
+
+def ring_parts(ring):
+    return [([p[0] for p in ring], [p[1] for p in ring], [0, len(ring)])]
+
+
+class EngineTest(unittest.TestCase):
+    """Test the engine against the per vertex reference implementation."""
+
+    def check_break_points(self):
+        for ring in random_rings(1):
+            parts = ring_parts(ring)
+            for lower, upper in ((20, 160), (0, 90), (45, 135), (0, 0), (90, 180)):
+                self.assertEqual(engine.featureBreakPoints(parts, lower, upper, True),
+                                 reference_results(parts, lower, upper, True)[0])
+
+    def test_break_points(self):
+        """Break points and angles match the reference bit for bit."""
+        if engine.np is None:
+            self.skipTest('numpy is not available')
+        with mock.patch.object(engine, 'SMALL_CHUNK_VERTICES', 0):
+            self.check_break_points()
+
+    def test_break_points_without_numpy(self):
+        """The pure Python fallback gives the same result."""
+        with mock.patch.object(engine, 'np', None):
+            self.check_break_points()
+
+    def test_trim_part(self):
+        """Closing vertices are dropped and short parts are rejected."""
+        self.assertEqual(engine.trimPart([0, 1], [0, 1]), (None, None))
+        self.assertEqual(engine.trimPart([0, 1, 1, 0], [0, 0, 1, 0]), ([0, 1, 1], [0, 0, 1]))
+        self.assertEqual(engine.trimPart([0, 1, 1], [0, 0, 1]), ([0, 1, 1], [0, 0, 1]))
+
+    def test_part_area(self):
+        """Part areas subtract the holes and select the largest part."""
+        square = ([0.0, 10.0, 10.0, 0.0, 0.0], [0.0, 0.0, 10.0, 10.0, 0.0])
+        hole = ([2.0, 2.0, 4.0, 4.0, 2.0], [2.0, 4.0, 4.0, 2.0, 2.0])
+        xs, ys = square[0] + hole[0], square[1] + hole[1]
+        self.assertEqual(engine.ringArea(*square), 100.0)
+        self.assertEqual(engine.partArea(xs, ys, [0, 5, 10]), 96.0)
+        small = ([0.0, 1.0, 1.0, 0.0], [0.0, 0.0, 1.0, 0.0], [0, 4])
+        parts = [small, (xs, ys, [0, 5, 10]), small]
+        self.assertIs(engine.largestPart(parts)[0], parts[1])
+        with mock.patch.object(engine, 'np', None):
+            self.assertEqual(engine.partArea(xs, ys, [0, 5, 10]), 96.0)
+
+    def check_histogram(self):
+        pairs = [(20, 160), (0, 180), (45, 135), (0, 0), (90, 180), (25, 30)]
+        for ring in random_rings(4):
+            parts = ring_parts(ring)
+            histogram = engine.featureResults(parts, 20, 160, True, histogramBins=36)[2]
+            self.assertEqual(len(histogram), 73)
+            self.assertEqual(engine.histogramFromBytes(engine.histogramBytes(histogram)), histogram)
+            expected = [len(engine.featureBreakPoints(parts, lower, upper, True)[0]) for lower, upper in pairs]
+            self.assertEqual(engine.histogramCounts(histogram, pairs), expected)
+
+    def test_histogram(self):
+        """Prefix sums of the histogram give the counts of edge aligned thresholds."""
+        if engine.np is None:
+            self.skipTest('numpy is not available')
+        with mock.patch.object(engine, 'SMALL_CHUNK_VERTICES', 0):
+            self.check_histogram()
+
+    def test_histogram_without_numpy(self):
+        with mock.patch.object(engine, 'np', None):
+            self.check_histogram()
+
+    def check_feature_results(self):
+        pairs = [(0, 90), (45, 135), (20, 160), (0, 0), (90, 180), (160, 20)]
+        rings = random_rings(6)
+        for k, ring in enumerate(rings):
+            parts = ring_parts(ring) + ring_parts(rings[k - 1])
+            for InnerRings in (True, False):
+                self.assertEqual(engine.featureResults(parts, 20, 160, InnerRings, pairs, 36),
+                                 reference_results(parts, 20, 160, InnerRings, pairs, 36))
+            self.assertEqual(engine.featureResults(parts, 20, 160, True)[1:], (None, None))
+
+    def test_feature_results(self):
+        """One classification gives the break points, sweep and histogram."""
+        if engine.np is None:
+            self.skipTest('numpy is not available')
+        with mock.patch.object(engine, 'SMALL_CHUNK_VERTICES', 0):
+            self.check_feature_results()
+
+    def test_feature_results_without_numpy(self):
+        with mock.patch.object(engine, 'np', None):
+            self.check_feature_results()
+
+    def test_chunk_results(self):
+        """The chunk wide numpy kernel equals the per part results."""
+        if engine.np is None:
+            self.skipTest('numpy is not available')
+        pairs = [(0, 90), (45, 135), (20, 160)]
+        partsList = [ring_parts(ring) for ring in random_rings(7)]
+        partsList.insert(3, [])
+        partsList.append([([0.0, 1.0], [0.0, 1.0], [0, 2])])
+        with mock.patch.object(engine, 'SMALL_CHUNK_VERTICES', 0):
+            results = engine.chunkResults(partsList, 20, 160, True, pairs, 36)
+        self.assertEqual(results, [reference_results(parts, 20, 160, True, pairs, 36) for parts in partsList])
+
+    def test_histogram_between_edges(self):
+        """Thresholds between edges count the bins holding them in full."""
+        histogram = engine.angleHistogram([0.0, 3.0, 5.0, 7.0, 180.0], 36)
+        self.assertEqual(engine.histogramCounts(histogram, [(4, 6), (0, 4), (1, 2), (179, 180)]), [3, 2, 1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+# coding=utf-8
+"""Tests for the direct GeoPackage reader."""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+import os
+import sqlite3
+import struct
+import tempfile
+import unittest
+
+from .. import break_pointer_gpkg as gpkg
+from .test_wkb import polygon_wkb
+
+SQUARE = [(0.0, 0.0), (4.0, 0.0), (4.0, 4.0), (0.0, 4.0), (0.0, 0.0)]
+
+
+def gpkg_blob(wkb, envelope=1, empty=False):
+    flags = 0x01 | (envelope << 1) | (0x10 if empty else 0)
+    return b'GP' + bytes([0, flags]) + struct.pack('<i', 3857) + b'\x00' * gpkg.ENVELOPE_SIZES[envelope] + wkb
+
+
+def create_gpkg(path, geometryType='POLYGON'):
+    connection = sqlite3.connect(path)
+    connection.execute('CREATE TABLE gpkg_geometry_columns (table_name TEXT, column_name TEXT, '
+                       'geometry_type_name TEXT, srs_id INTEGER, z TINYINT, m TINYINT)')
+    connection.execute("INSERT INTO gpkg_geometry_columns VALUES ('land cover', 'geom', ?, 3857, 0, 0)",
+                       (geometryType,))
+    connection.execute('CREATE TABLE "land cover" (fid INTEGER PRIMARY KEY AUTOINCREMENT, geom BLOB, '
+                       'code TEXT, category INTEGER)')
+    connection.executemany('INSERT INTO "land cover" VALUES (?, ?, ?, ?)', [
+        (7, gpkg_blob(polygon_wkb([SQUARE]), envelope=0), 'a', 1),
+        (3, gpkg_blob(polygon_wkb([SQUARE]), envelope=4), 'b', None),
+        (5, None, 'c', 2),
+    ])
+    connection.commit()
+    connection.close()
+
+
+class GeoPackageTest(unittest.TestCase):
+    """Test the header stripping and the batched table reads."""
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, 'layer.gpkg')
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_header(self):
+        """Every envelope size is stripped, empty geometries give no WKB."""
+        wkb = polygon_wkb([SQUARE])
+        for envelope in gpkg.ENVELOPE_SIZES:
+            self.assertEqual(gpkg.gpkgWkb(gpkg_blob(wkb, envelope)), wkb)
+        self.assertEqual(gpkg.gpkgWkb(gpkg_blob(wkb, empty=True)), b'')
+        self.assertEqual(gpkg.gpkgWkb(None), b'')
+        with self.assertRaises(ValueError):
+            gpkg.gpkgWkb(wkb)
+
+    def test_records(self):
+        """Rows come in fid order with the requested columns."""
+        create_gpkg(self.path)
+        reader = gpkg.GeoPackageReader(self.path)
+        self.assertEqual((reader.table, reader.geometryColumn, reader.fidColumn), ('land cover', 'geom', 'fid'))
+        records = list(reader.records(['category', 'code'], batchSize=2))
+        reader.close()
+        wkb = polygon_wkb([SQUARE])
+        self.assertEqual(records, [(3, wkb, None, 'b'), (5, b'', 2, 'c'), (7, wkb, 1, 'a')])
+
+    def test_rect_records(self):
+        """Rows are looked up in the spatial index with their bounds."""
+        create_gpkg(self.path)
+        reader = gpkg.GeoPackageReader(self.path)
+        self.assertIsNone(reader.spatialIndex())
+        reader.close()
+        connection = sqlite3.connect(self.path)
+        connection.execute('CREATE VIRTUAL TABLE "rtree_land cover_geom" USING rtree(id, minx, maxx, miny, maxy)')
+        connection.executemany('INSERT INTO "rtree_land cover_geom" VALUES (?, ?, ?, ?, ?)',
+                               [(7, 0, 4, 0, 4), (3, 10, 14, 0, 4)])
+        connection.commit()
+        connection.close()
+        reader = gpkg.GeoPackageReader(self.path)
+        self.assertEqual(reader.spatialIndex(), 'rtree_land cover_geom')
+        records = list(reader.rectRecords((3, -1, 20, 1), ['code'], batchSize=1))
+        self.assertEqual(list(reader.rectRecords((5, 5, 9, 9))), [])
+        unindexed = list(reader.unindexedRecords(['code']))
+        reader.close()
+        wkb = polygon_wkb([SQUARE])
+        self.assertEqual(records, [(3, wkb, (10, 0, 14, 4), 'b'), (7, wkb, (0, 0, 4, 4), 'a')])
+        self.assertEqual(unindexed, [(5, b'', 'c')])
+
+    def test_rejected(self):
+        """Non polygon tables and unknown table names are refused."""
+        create_gpkg(self.path, 'LINESTRING')
+        with self.assertRaises(ValueError):
+            gpkg.GeoPackageReader(self.path)
+        os.remove(self.path)
+        create_gpkg(self.path)
+        with self.assertRaises(ValueError):
+            gpkg.GeoPackageReader(self.path, 'roads')
+        gpkg.GeoPackageReader(self.path, 'Land Cover').close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# coding=utf-8
+"""Tests for the process pool break point evaluation."""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+import random
+import unittest
+from unittest import mock
+
+from .. import break_pointer_parallel as parallel
+from .test_wkb import polygon_wkb, multipolygon_wkb
+
+
+def random_records(seed, count):
+    rnd = random.Random(seed)
+    records = []
+    for fid in range(count):
+        ring = [(rnd.uniform(0, 100), rnd.uniform(0, 100)) for _ in range(rnd.randint(3, 30))]
+        ring.append(ring[0])
+        if fid % 3:
+            wkb = polygon_wkb([ring])
+        else:
+            wkb = multipolygon_wkb([[ring], [[(p[0] + 200, p[1]) for p in ring]]])
+        records.append((fid, wkb, f'id{fid}'))
+    return records
+
+
+class ParallelTest(unittest.TestCase):
+    """Test that every mode returns the serial results in input order."""
+
+    def setUp(self):
+        self.records = random_records(3, 40)
+        self.expected = list(parallel.breakPointResults(self.records, 20, 160, True))
+
+    def test_serial_order(self):
+        """Serial results keep the records in input order."""
+        self.assertEqual([record for record, points, counts, histogram in self.expected], self.records)
+        self.assertTrue(any(points[0] for record, points, counts, histogram in self.expected))
+        self.assertEqual({counts for record, points, counts, histogram in self.expected}, {None})
+
+    def test_process_pool(self):
+        """A real process pool gives the serial results."""
+        messages = []
+        results = list(parallel.breakPointResults(self.records, 20, 160, True, workers=2, chunkSize=7,
+                                                  onFallback=messages.append))
+        self.assertEqual(messages, [])
+        self.assertEqual(results, self.expected)
+
+    def test_shared_executor(self):
+        """A shared pool serves several runs and is left running."""
+        executor = parallel.createExecutor(2)
+        try:
+            for _ in range(2):
+                results = list(parallel.breakPointResults(self.records, 20, 160, True, workers=2, chunkSize=7,
+                                                          executor=executor))
+                self.assertEqual(results, self.expected)
+        finally:
+            executor.shutdown()
+
+    def test_fallback(self):
+        """When no pool can be started the calculation runs serially."""
+        messages = []
+        with mock.patch.object(parallel, 'createExecutor', side_effect=OSError('no interpreter')):
+            results = list(parallel.breakPointResults(self.records, 20, 160, True, workers=4, chunkSize=5,
+                                                      onFallback=messages.append))
+        self.assertEqual(results, self.expected)
+        self.assertEqual(len(messages), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
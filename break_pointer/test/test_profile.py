@@ -0,0 +1,70 @@
+# coding=utf-8
+"""Tests for the stage profile and the WKB vertex count."""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+import json
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from ..break_pointer_profile import StageProfile
+from ..break_pointer_wkb import vertexCount, decodePolygons
+from .test_wkb import polygon_wkb, multipolygon_wkb
+
+SQUARE = [(0.0, 0.0), (4.0, 0.0), (4.0, 4.0), (0.0, 4.0), (0.0, 0.0)]
+
+
+class ProfileTest(unittest.TestCase):
+    """Test the recorded stages, rates and memory tracing."""
+
+    def test_stages(self):
+        """Laps, blocks and iterators add up per stage."""
+        profile = StageProfile()
+        profile.lap('setup')
+        self.assertEqual(list(profile.timed(range(3), 'loop')), [0, 1, 2])
+        with profile.stage('block'):
+            pass
+        with profile.stage('block'):
+            pass
+        profile.count('features', 4)
+        profile.count('features')
+        profile.add('calculateBPI', 0.5)
+        report = profile.report()
+        self.assertEqual(list(report['stages']), ['setup', 'loop', 'block', 'calculateBPI'])
+        self.assertEqual(report['counters'], {'features': 5})
+        self.assertEqual(report['rates']['featuresPerSecond'], 10.0)
+        self.assertIsNone(report['rates']['verticesPerSecond'])
+        self.assertIsNone(report['peakMemory'])
+        self.assertTrue(any(line.startswith('featuresPerSecond') for line in profile.lines()))
+        profile.close()
+
+    def test_memory(self):
+        """Tracing is started and stopped only by the profile that owns it."""
+        if tracemalloc.is_tracing():
+            self.skipTest('tracemalloc is already running')
+        profile = StageProfile(traceMemory=True)
+        data = [bytes(1000) for _ in range(100)]
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'profile.json')
+            profile.save(path)
+            with open(path, encoding='utf-8') as f:
+                self.assertGreater(json.load(f)['peakMemory'], 100000)
+        profile.close()
+        self.assertFalse(tracemalloc.is_tracing())
+        del data
+
+    def test_vertex_count(self):
+        """The vertex count reads only the ring headers."""
+        hole = [(1.0, 1.0), (1.0, 2.0), (2.0, 2.0), (1.0, 1.0)]
+        for wkb in (polygon_wkb([SQUARE, hole]), multipolygon_wkb([[SQUARE], [SQUARE, hole]], endian='>'),
+                    polygon_wkb([SQUARE], wkbType=1003, dims=3)):
+            self.assertEqual(vertexCount(wkb), sum(len(xs) for xs, ys, offsets in decodePolygons(wkb)))
+        self.assertEqual(vertexCount(b''), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+# coding=utf-8
+"""Tests for the array backed result store."""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+import unittest
+from unittest import mock
+
+from .. import break_pointer_results as results
+
+
+def rows(store, chunkSize):
+    return [row for columns in store.columnChunks(chunkSize) for row in results.attributeRows(columns)]
+
+
+class ResultStoreTest(unittest.TestCase):
+    """Test the chunked attribute rows with and without numpy."""
+
+    def setUp(self):
+        self.store = results.ResultStore(pairCount=1, histogramBytes=results.histogramSize(1))
+        self.store.add(3, 4, 8.0, 2.0, [1], b'\x01' * 12)
+        self.store.add(5, 2, 0.0, 4.0, [0], b'\x02' * 12)
+        self.store.add(9, 0, 1.0, 0.0, [3], b'\x03' * 12)
+        self.expected = [
+            (3, 4.0, 2.0, 0.5, ((1.0, 0.5, 0.125),), b'\x01' * 12),
+            (5, 2.0, 0.5, None, ((0.0, 0.0, None),), b'\x02' * 12),
+            (9, 0.0, None, 0.0, ((3.0, None, 3.0),), b'\x03' * 12),
+        ]
+
+    def test_rows(self):
+        """Densities are zero guarded and the chunks keep the order."""
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(rows(self.store, 2), self.expected)
+
+    def test_rows_without_numpy(self):
+        with mock.patch.object(results, 'np', None):
+            self.assertEqual(rows(self.store, 1), self.expected)
+
+    def test_without_extras(self):
+        store = results.ResultStore()
+        store.add(1, 2, 4.0, 8.0)
+        self.assertEqual(rows(store, 10), [(1, 2.0, 0.25, 0.5, (), None)])
+
+    def test_summary(self):
+        """Layer totals and densities, with and without numpy."""
+        expected = {'features': 3, 'breakPoints': 6, 'perimeter': 6.0, 'area': 9.0,
+                    'meanBpi': 2.0, 'densPerim': 1.0, 'densArea': 6 / 9}
+        self.assertEqual(results.resultSummary(self.store, 2), expected)
+        with mock.patch.object(results, 'np', None):
+            self.assertEqual(results.resultSummary(self.store, 2), expected)
+        self.assertEqual(results.resultSummary(results.ResultStore())['meanBpi'], None)
+
+
+if __name__ == '__main__':
+    unittest.main()
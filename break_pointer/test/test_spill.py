@@ -0,0 +1,73 @@
+# coding=utf-8
+"""Tests for the temporary file stores of the streaming mode."""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+import random
+import unittest
+from unittest import mock
+
+from .. import break_pointer_spill as spill_module
+from ..break_pointer_spill import ResultSpill
+from ..break_pointer_results import ResultStore, attributeRows
+from ..break_pointer_categories import CategoryIndex, DiskCategoryIndex
+
+
+class SpillTest(unittest.TestCase):
+    """Test that the disk stores return what the in-memory ones do."""
+
+    def test_result_spill(self):
+        """Records come back in order through several buffer flushes."""
+        store = ResultStore(pairCount=2, histogramBytes=8)
+        spill = ResultSpill(pairCount=2, histogramBytes=8, bufferBytes=100)
+        for fid in range(25):
+            values = (fid, fid, fid * 1.5, float(fid % 3), [fid, 2 * fid], bytes([fid]) * 8)
+            store.add(*values)
+            spill.add(*values)
+        self.assertEqual(len(spill), 25)
+        rows = [row for columns in store.columnChunks(7) for row in attributeRows(columns)]
+        self.assertEqual([row for columns in spill.columnChunks(7) for row in attributeRows(columns)], rows)
+        with mock.patch.object(spill_module, 'np', None):
+            self.assertEqual([row for columns in spill.columnChunks(4) for row in attributeRows(columns)], rows)
+        spill.close()
+
+    def test_disk_category_index(self):
+        """The SQLite backed index gives the same pairs as the dict one."""
+        rnd = random.Random(5)
+        memory, disk = CategoryIndex(True), DiskCategoryIndex(True, bufferRows=7)
+        for _ in range(300):
+            point = (float(rnd.randint(0, 20)), float(rnd.randint(0, 20)))
+            category = rnd.choice('abcd')
+            memory.add(point, category)
+            disk.add(point, category)
+        for _ in range(20):
+            xs = [float(rnd.randint(0, 5)) for _ in range(5)]
+            ys = [float(rnd.randint(0, 5)) for _ in range(5)]
+            category = rnd.choice('abc')
+            memory.addSegments(xs, ys, [0, 5], category)
+            disk.addSegments(xs, ys, [0, 5], category)
+        self.assertEqual(disk.pairPoints(), memory.pairPoints())
+        self.assertEqual(disk.sparseMatrix(), memory.sparseMatrix())
+        self.assertEqual(disk.pairLengths().keys(), memory.pairLengths().keys())
+        for pair, length in memory.pairLengths().items():
+            self.assertAlmostEqual(disk.pairLengths()[pair], length)
+        disk.close()
+
+    def test_disk_pair_metrics(self):
+        """The streamed centroid lengths equal the in-memory ones."""
+        rnd = random.Random(8)
+        memory, disk = CategoryIndex(), DiskCategoryIndex(bufferRows=5)
+        for _ in range(400):
+            point = (float(rnd.randint(0, 30)), float(rnd.randint(0, 30)))
+            category = rnd.choice('abcde')
+            memory.add(point, category)
+            disk.add(point, category)
+        self.assertEqual(list(disk.pairGroups()), sorted(memory.pairGroups()))
+        self.assertEqual(disk.pairMetrics(), memory.pairMetrics())
+        disk.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+# coding=utf-8
+"""Tests for the vertex thinning prefilter."""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+import math
+import unittest
+from unittest import mock
+
+from .. import break_pointer_thinning as thinning
+from .. import break_pointer_wkb as wkbModule
+from ..break_pointer_wkb import decodePolygons, encodePolygons
+from .test_wkb import polygon_wkb, multipolygon_wkb
+
+
+def dense_square(step):
+    ring = [(x * step, 0.0) for x in range(int(4 / step))]
+    ring += [(4.0, y * step) for y in range(int(4 / step))]
+    ring += [(4.0 - x * step, 4.0) for x in range(int(4 / step))]
+    ring += [(0.0, 4.0 - y * step) for y in range(int(4 / step))]
+    return ring + [ring[0]]
+
+
+def circle(vertices, radius=10.0):
+    ring = [(radius * math.cos(2 * math.pi * i / vertices), radius * math.sin(2 * math.pi * i / vertices))
+            for i in range(vertices)]
+    return ring + [ring[0]]
+
+
+class ThinningTest(unittest.TestCase):
+    """Test both filters with and without numpy."""
+
+    def check(self):
+        square = dense_square(0.5)
+        xs, ys = thinning.thinRing([x for x, y in square], [y for x, y in square], collinear=True)
+        self.assertEqual(list(zip(map(float, xs), map(float, ys))),
+                         [(0.0, 0.0), (4.0, 0.0), (4.0, 4.0), (0.0, 4.0), (0.0, 0.0)])
+
+        ring = circle(1000)
+        xs, ys = thinning.thinRing([x for x, y in ring], [y for x, y in ring], tolerance=2.0)
+        self.assertTrue(30 <= len(xs) <= 34)
+        self.assertEqual((float(xs[0]), float(ys[0])), (float(xs[-1]), float(ys[-1])))
+
+        # A repeated corner is a corner, not two collinear vertices
+        xs, ys = thinning.thinRing([0, 10, 10, 10, 0, 0], [0, 0, 0, 10, 10, 0], collinear=True)
+        self.assertEqual(list(zip(map(float, xs), map(float, ys))),
+                         [(0.0, 0.0), (10.0, 0.0), (10.0, 10.0), (0.0, 10.0), (0.0, 0.0)])
+
+        # The tolerance is a distance, vertices close to a kept one go
+        xs, ys = thinning.thinRing([0, 1.999999, 2.000001, 5, 5, 0, 0], [0, 0, 0, 0, 4, 4, 0], tolerance=2.0)
+        self.assertEqual(list(map(float, xs)), [0.0, 2.000001, 5.0, 5.0, 0.0, 0.0])
+
+        triangle = [(0.0, 0.0), (1.0, 0.0), (2.0, 0.0), (1.0, 1.0), (0.0, 0.0)]
+        xs, ys = thinning.thinRing([x for x, y in triangle], [y for x, y in triangle], tolerance=100.0)
+        self.assertEqual(len(xs), 5)
+
+        wkb = multipolygon_wkb([[circle(200), dense_square(0.1)], [dense_square(1.0)]])
+        thinned, removed = thinning.thinWkb(wkb, tolerance=0.5, collinear=True)
+        self.assertEqual(wkbModule.vertexCount(wkb) - wkbModule.vertexCount(thinned), removed)
+        self.assertEqual([len(ringOffsets) for xs, ys, ringOffsets in decodePolygons(thinned)], [3, 2])
+        self.assertEqual(decodePolygons(thinned)[1][2], [0, 5])
+        return removed
+
+    def test_filters(self):
+        removed = self.check()
+        with mock.patch.object(thinning, 'np', None), mock.patch.object(wkbModule, 'np', None):
+            self.assertEqual(self.check(), removed)
+
+    def test_unchanged(self):
+        """Nothing to remove returns the same WKB, encoding round trips."""
+        wkb = polygon_wkb([circle(12)])
+        self.assertEqual(thinning.thinWkb(wkb, collinear=True), (wkb, 0))
+        parts = decodePolygons(multipolygon_wkb([[circle(12), dense_square(1.0)]]))
+        self.assertEqual([[list(map(float, xs)), list(map(float, ys)), offsets]
+                          for xs, ys, offsets in decodePolygons(encodePolygons(parts))],
+                         [[list(map(float, xs)), list(map(float, ys)), offsets] for xs, ys, offsets in parts])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+# coding=utf-8
+"""Tests for the tile grid."""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+import random
+import unittest
+
+from ..break_pointer_tiles import TileGrid
+
+
+def intersects(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+class TileGridTest(unittest.TestCase):
+    """Test the one tile per polygon assignment."""
+
+    def test_grid(self):
+        """The extent is covered by whole tiles."""
+        grid = TileGrid(0, 0, 25, 10, 10)
+        self.assertEqual((grid.columns, grid.rows, len(grid)), (3, 1, 3))
+        self.assertEqual(len(TileGrid(5, 5, 5, 5, 10)), 1)
+        self.assertEqual(grid.tileIndex(10, 5), 1)
+        self.assertEqual(grid.tileIndex(-3, 50), 0)
+        with self.assertRaises(ValueError):
+            TileGrid(0, 0, 1, 1, 0)
+
+    def test_assignment(self):
+        """Every bounding box belongs to exactly one tile, whose query
+        rectangle intersects it."""
+        rng = random.Random(3)
+        grid = TileGrid(-50, 20, 130, 95, 17)
+        tiles = list(grid.tiles())
+        for _ in range(500):
+            x, y = rng.uniform(-50, 130), rng.uniform(20, 95)
+            bounds = (x, y, min(x + rng.uniform(0, 60), 130), min(y + rng.uniform(0, 60), 95))
+            owners = [index for index, rect in tiles if grid.owns(index, bounds)]
+            self.assertEqual(len(owners), 1)
+            self.assertTrue(intersects(tiles[owners[0]][1], bounds))
+
+
+if __name__ == '__main__':
+    unittest.main()
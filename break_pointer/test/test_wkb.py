@@ -0,0 +1,91 @@
+# coding=utf-8
+"""Tests for the WKB polygon decoder."""
+
+__author__ = 'gudmandras'
+__date__ = '2026-10-17'
+__copyright__ = '(C) 2025 by gudmandras'
+
+import struct
+import unittest
+from unittest import mock
+
+from .. import break_pointer_wkb as wkb
+
+
+def polygon_wkb(rings, endian='<', wkbType=3, dims=2):
+    data = struct.pack(endian + 'bII', 1 if endian == '<' else 0, wkbType, len(rings))
+    for ring in rings:
+        data += struct.pack(endian + 'I', len(ring))
+        for point in ring:
+            data += struct.pack(endian + 'd' * dims, *(tuple(point) + (7.0,) * (dims - 2)))
+    return data
+
+
+def multipolygon_wkb(polygons, endian='<', wkbType=6, partType=3, dims=2):
+    data = struct.pack(endian + 'bII', 1 if endian == '<' else 0, wkbType, len(polygons))
+    for rings in polygons:
+        data += polygon_wkb(rings, endian, partType, dims)
+    return data
+
+
+OUTER = [(0.0, 0.0), (10.0, 0.0), (10.0, 10.0), (0.0, 10.0), (0.0, 0.0)]
+HOLE = [(2.0, 2.0), (2.0, 4.0), (4.0, 4.0), (2.0, 2.0)]
+SMALL = [(20.0, 20.0), (21.0, 20.0), (21.0, 21.0), (20.0, 20.0)]
+
+
+class WkbTest(unittest.TestCase):
+    """Test decoding of the polygon WKB flavours QGIS hands out."""
+
+    def as_lists(self, parts):
+        return [([float(x) for x in xs], [float(y) for y in ys], list(offsets))
+                for xs, ys, offsets in parts]
+
+    def expected(self, polygons):
+        return [([p[0] for ring in rings for p in ring], [p[1] for ring in rings for p in ring],
+                 [sum(len(ring) for ring in rings[:i]) for i in range(len(rings) + 1)])
+                for rings in polygons]
+
+    def check_decoding(self):
+        self.assertEqual(self.as_lists(wkb.decodePolygons(polygon_wkb([OUTER, HOLE]))),
+                         self.expected([[OUTER, HOLE]]))
+        self.assertEqual(self.as_lists(wkb.decodePolygons(polygon_wkb([OUTER], endian='>'))),
+                         self.expected([[OUTER]]))
+        self.assertEqual(self.as_lists(wkb.decodePolygons(multipolygon_wkb([[OUTER, HOLE], [SMALL]]))),
+                         self.expected([[OUTER, HOLE], [SMALL]]))
+        # PolygonZ, MultiPolygonZM and QGIS 2.5D
+        self.assertEqual(self.as_lists(wkb.decodePolygons(polygon_wkb([OUTER], wkbType=1003, dims=3))),
+                         self.expected([[OUTER]]))
+        self.assertEqual(self.as_lists(wkb.decodePolygons(
+            multipolygon_wkb([[SMALL]], wkbType=3006, partType=3003, dims=4))), self.expected([[SMALL]]))
+        self.assertEqual(self.as_lists(wkb.decodePolygons(
+            polygon_wkb([OUTER], wkbType=0x80000003, dims=3))), self.expected([[OUTER]]))
+        self.assertEqual(wkb.decodePolygons(b''), [])
+
+    def test_decode(self):
+        """Polygon and MultiPolygon buffers decode to flat ring coordinates."""
+        if wkb.np is None:
+            self.skipTest('numpy is not available')
+        self.check_decoding()
+
+    def test_decode_without_numpy(self):
+        """The array module fallback decodes the same coordinates."""
+        with mock.patch.object(wkb, 'np', None):
+            self.check_decoding()
+
+    def test_encode_multipoint(self):
+        """MultiPoint WKB is the same with and without numpy."""
+        xs, ys = [1.0, -2.5, 3.25], [4.0, 5.0, -6.0]
+        expected = struct.pack('<BII', 1, 4, 3) + b''.join(struct.pack('<BIdd', 1, 1, x, y) for x, y in zip(xs, ys))
+        self.assertEqual(wkb.encodeMultiPoint(xs, ys), expected)
+        with mock.patch.object(wkb, 'np', None):
+            self.assertEqual(wkb.encodeMultiPoint(xs, ys), expected)
+        self.assertEqual(wkb.encodeMultiPoint([], []), struct.pack('<BII', 1, 4, 0))
+
+    def test_unsupported_type(self):
+        """Non polygonal geometries are rejected."""
+        point = struct.pack('<bIdd', 1, 1, 1.0, 2.0)
+        self.assertRaises(ValueError, wkb.decodePolygons, point)
+
+
+if __name__ == '__main__':
+    unittest.main()